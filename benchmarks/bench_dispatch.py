@@ -0,0 +1,77 @@
+"""
+Бенчмарк диспетчеризації кроків: StepsRegistry.match / execute_step
+на реєстрі з сотнями синтетичних шаблонів.
+
+    python -m benchmarks.bench_dispatch --patterns 500 --steps 100000
+
+Обробники синтетичних кроків нічого не роблять, тож вимірюється лише
+накладна вартість фреймворку: пошук визначення, regex-match і виклик.
+"""
+import argparse
+import random
+from typing import Dict, List
+
+from benchmarks.bench_parser import timed
+from framework.core.config import Config
+from framework.core.context import Context
+from framework.core.steps_registry import StepsRegistry
+
+# шаблони в стилі справжніх кроків: спільні початки ("I click ...")
+# роблять індекс по префіксах показовим
+PATTERN_TEMPLATES = [
+    r'^I click widget {n} "(.+)"$',
+    r'^I expect block {n} contains "(.+)"$',
+    r'^I fill field {n} with "(.+)"$',
+    r'^user {n} is logged in as "(\w+)"$',
+]
+
+
+def build_registry(patterns: int) -> StepsRegistry:
+    registry = StepsRegistry(Context(config=Config()))
+
+    def noop(m):
+        return None
+
+    for n in range(patterns):
+        template = PATTERN_TEMPLATES[n % len(PATTERN_TEMPLATES)]
+        registry._register(template.format(n=n), noop)
+    return registry
+
+
+def generate_texts(patterns: int, count: int) -> List[str]:
+    rnd = random.Random(42)
+    texts = []
+    for _ in range(count):
+        n = rnd.randrange(patterns)
+        template = PATTERN_TEMPLATES[n % len(PATTERN_TEMPLATES)]
+        literal = template.format(n=n)[1:-1]
+        texts.append(literal.replace('"(.+)"', '"value"').replace('"(\\w+)"', '"admin"'))
+    return texts
+
+
+def run(patterns: int = 500, steps: int = 100_000) -> Dict[str, float]:
+    """Повертає метрики в секундах на один крок (для benchmarks.run)."""
+    registry = build_registry(patterns)
+    texts = generate_texts(patterns, steps)
+    print(f"Registry: {patterns} synthetic patterns, {steps} step texts")
+
+    match_time = timed("match", lambda: [registry.match(t) for t in texts])
+    execute_time = timed("execute_step", lambda: [registry.execute_step(t) for t in texts])
+    return {
+        "match_per_step": match_time / steps,
+        "execute_step_per_step": execute_time / steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step dispatch benchmark")
+    parser.add_argument("--patterns", type=int, default=500)
+    parser.add_argument("--steps", type=int, default=100_000)
+    args = parser.parse_args()
+    metrics = run(args.patterns, args.steps)
+    for name, seconds in metrics.items():
+        print(f"{name:<28} {seconds * 1e6:9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Наскрізний бенчмарк раннера проти локальної статичної копії сторінок Kwiga.
+
+    python -m benchmarks.bench_e2e --features 200 --workers 4
+
+Сторінки віддає локальний HTTP-сервер, тож затримки сайту немає і час
+прогону — це накладні витрати фреймворку: старт, компіляція, планування,
+виконання кроків, звіти. Сценарії складені з кроків, що працюють на
+HTTP-бекенді (браузер не потрібен).
+"""
+import argparse
+import contextlib
+import io
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.bench_parser import timed
+from framework.core import runner
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+_HEADER = (
+    '<header><a href="/">Kwiga</a> <a href="/pricing">Prices</a> '
+    '<a href="/blog">Blog</a> <a href="/ua">UA</a></header>'
+)
+_FOOTER = (
+    '<footer><a href="/about-us">About Us</a> '
+    '<a href="/privacy-policy">Privacy Policy</a> '
+    '<a href="/terms">Terms and Conditions</a></footer>'
+)
+
+
+def _page(title: str, body: str, lang: str = "en") -> bytes:
+    return (
+        f'<!DOCTYPE html><html lang="{lang}"><head><title>{title}</title></head>'
+        f"<body>{_HEADER}<main><h1>{title}</h1>{body}</main>{_FOOTER}</body></html>"
+    ).encode("utf-8")
+
+
+PAGES = {
+    "/": _page(
+        "Kwiga",
+        "<p>All tools for a successful business</p><p>Olga Mikhalchuk</p>"
+        "<p>20M+ USD</p><p>600,000+ projects</p>",
+    ),
+    "/ua": _page("Kwiga", "<p>Усі інструменти для успішного бізнесу</p>", lang="uk"),
+    "/pricing": _page("Pricing", "<p>Plans and prices</p>"),
+    "/blog": _page("Blog", "<p>Latest articles</p>"),
+    "/about-us": _page("About Us", "<p>Our team</p>"),
+    "/privacy-policy": _page("Privacy Policy", "<p>Personal data</p>"),
+    "/terms": _page("Terms", "<p>PLEASE STUDY THIS DOCUMENT ATTENTIVELY.</p>"),
+}
+
+SCENARIOS = [
+    [
+        'When I open "home"',
+        'Then I expect page contains text "Olga Mikhalchuk"',
+        'And I expect page contains text "20M+ USD"',
+        'And I expect page language is "en"',
+    ],
+    [
+        'When I open "home"',
+        'And I click footer link "About Us"',
+        'Then I expect current url contains "about-us"',
+        'And I expect page contains text "Our team"',
+    ],
+    [
+        'When I open "home"',
+        'And I click header menu "Blog"',
+        'Then I expect current url contains "blog"',
+    ],
+    [
+        'When I open "home"',
+        'And I click footer link "Terms and Conditions"',
+        'Then I expect page contains text "PLEASE STUDY THIS DOCUMENT ATTENTIVELY."',
+        'And I expect current url contains "terms"',
+    ],
+]
+
+
+class _StaticHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # заголовки і тіло йдуть окремими write — без TCP_NODELAY кожна
+    # відповідь чекає ~40 мс на delayed ACK клієнта
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = PAGES.get(self.path.split("?")[0].rstrip("/") or "/")
+        self.send_response(200 if body is not None else 404)
+        body = body or b"not found"
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_site() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StaticHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def generate_features(directory: Path, features: int, base_url: str) -> int:
+    """Повертає загальну кількість кроків."""
+    total_steps = 0
+    for i in range(features):
+        lines = [f"Feature: Benchmark feature {i}"]
+        for s, steps in enumerate(SCENARIOS):
+            lines.append(f"  Scenario: Benchmark scenario {i}.{s}")
+            lines.append(f'    Given app baseUrl "{base_url}"')
+            lines.extend(f"    {step}" for step in steps)
+            total_steps += len(steps) + 1
+        (directory / f"{i:05d}_bench.kwiga").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+    return total_steps
+
+
+def measure_startup(repeat: int = 5) -> float:
+    """Найкращий час імпорту раннера в новому процесі (секунди)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", "import framework.core.runner"],
+            cwd=PROJECT_ROOT,
+            check=True,
+        )
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def check_passed(reports_dir: Path, scenarios: int):
+    """Бенчмарк міряє лише шлях без помилок: падіння сценаріїв — помилка бенчмарку."""
+    suites = ET.parse(reports_dir / "junit.xml").getroot()
+    tests, failures = int(suites.get("tests")), int(suites.get("failures"))
+    if tests != scenarios or failures:
+        raise RuntimeError(
+            f"Benchmark suite is broken: {failures} of {tests} scenario(s) failed, "
+            f"expected {scenarios} passing"
+        )
+
+
+def run(features: int = 200, workers: int = 1) -> Dict[str, float]:
+    """Повертає метрики в секундах (для benchmarks.run)."""
+    server = start_site()
+    base_url = f"http://kwiga.localhost:{server.server_port}"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_dir = Path(tmp)
+            features_dir = tmp_dir / "features"
+            features_dir.mkdir()
+            total_steps = generate_features(features_dir, features, base_url)
+            print(f"Suite: {features} features, {total_steps} steps, {workers} worker(s)")
+
+            argv: List[str] = [
+                "--features-dir", str(features_dir),
+                "--cache-dir", str(tmp_dir / "cache"),
+                "--reports-dir", str(tmp_dir / "reports"),
+                "--workers", str(workers),
+            ]
+
+            def run_suite():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    if runner.main(argv):
+                        raise RuntimeError("Benchmark suite does not compile")
+
+            cold = timed("runner (cold cache)", run_suite)
+            check_passed(tmp_dir / "reports", features * len(SCENARIOS))
+            warm = timed("runner (warm cache)", run_suite)
+            check_passed(tmp_dir / "reports", features * len(SCENARIOS))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    startup = measure_startup()
+    print(f"{'startup (import, best)':<28} {startup * 1000:9.1f} ms")
+    return {
+        "startup": startup,
+        "runner_cold": cold,
+        "runner_warm": warm,
+        "per_step": warm / total_steps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end runner benchmark")
+    parser.add_argument("--features", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    metrics = run(args.features, args.workers)
+    print(f"{'per step':<28} {metrics['per_step'] * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Бенчмарк парсера фіч на синтетичному корпусі.
+
+    python -m benchmarks.bench_parser --files 5000
+
+Міряє: parse_feature по тексту в пам'яті, холодний парсинг файлів без кешу, перший прогін з кешем (усі промахи)
+і повторний прогін з кешем (усі влучання, включно з завантаженням кешу).
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from framework.core.dsl_parser import parse_feature, parse_feature_file
+from framework.core.parse_cache import ParseCache
+
+STEP_TEMPLATES = [
+    'Given app baseUrl "https://kwiga.com"',
+    'And browser "chrome" headless true',
+    'When I open "home"',
+    'And I click footer link "Link {n}"',
+    'And I click header menu "Menu {n}"',
+    'Then I expect page contains text "Text {n}"',
+    'But I expect current url contains "path-{n}"',
+]
+
+
+def generate_corpus(directory: Path, files: int, scenarios: int, steps: int) -> List[Path]:
+    rnd = random.Random(42)
+    paths = []
+    for i in range(files):
+        lines = [f"Feature: Synthetic feature {i}"]
+        for s in range(scenarios):
+            lines.append(f"  # scenario {s}")
+            lines.append(f"  Scenario: Synthetic scenario {i}.{s}")
+            for _ in range(steps):
+                template = rnd.choice(STEP_TEMPLATES)
+                lines.append("    " + template.format(n=rnd.randint(0, 999)))
+        path = directory / f"{i}_synthetic.kwiga"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def timed(label: str, func) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+def run(files: int = 5000, scenarios: int = 3, steps: int = 8) -> Dict[str, float]:
+    """Повертає метрики в секундах (для benchmarks.run)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        paths = generate_corpus(tmp_dir, files, scenarios, steps)
+        cache_path = tmp_dir / "parse_cache.pickle"
+        print(f"Corpus: {files} files x {scenarios} scenarios x {steps} steps")
+
+        def cold_cache():
+            cache = ParseCache(cache_path)
+            for p in paths:
+                cache.get(p)
+            cache.save()
+
+        def warm_cache():
+            cache = ParseCache(cache_path)
+            for p in paths:
+                cache.get(p)
+            assert cache.misses == 0
+
+        texts = [p.read_text(encoding="utf-8") for p in paths]
+        return {
+            "parse_feature": timed(
+                "parse_feature (in memory)", lambda: [parse_feature(t) for t in texts]
+            ),
+            "parse_feature_file": timed(
+                "parse (no cache)", lambda: [parse_feature_file(p) for p in paths]
+            ),
+            "parse_cache_miss": timed("parse + cache build (miss)", cold_cache),
+            "parse_cache_hit": timed("cache load + hits", warm_cache),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature parser benchmark")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--scenarios", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=8)
+    args = parser.parse_args()
+    run(args.files, args.scenarios, args.steps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Запуск усіх бенчмарків зі збереженням результатів у JSON і порівнянням
+з базовою лінією.
+
+    python -m benchmarks.run --output benchmarks/results/current.json
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json
+
+Усі метрики — секунди, менше = краще. Код виходу 1, якщо якась метрика
+гірша за базову більше ніж на --threshold (за замовчуванням 20%).
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+from benchmarks import bench_dispatch, bench_e2e, bench_parser
+
+
+def run_all(quick: bool = False) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    print("--- parser ---")
+    for name, value in bench_parser.run(files=500 if quick else 5000).items():
+        metrics[f"parser.{name}"] = value
+    print("--- dispatch ---")
+    for name, value in bench_dispatch.run(steps=20_000 if quick else 100_000).items():
+        metrics[f"dispatch.{name}"] = value
+    print("--- end-to-end ---")
+    for name, value in bench_e2e.run(features=20 if quick else 200).items():
+        metrics[f"e2e.{name}"] = value
+    return metrics
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], threshold: float) -> bool:
+    """Друкує таблицю змін; False — є регресії понад threshold."""
+    ok = True
+    print(f"\n{'metric':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in sorted(metrics.items()):
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<36} {'-':>12} {value:12.6f} {'new':>8}")
+            continue
+        change = value / base - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            ok = False
+        print(f"{name:<36} {base:12.6f} {value:12.6f} {change:+7.1%}{mark}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all framework benchmarks")
+    parser.add_argument("--output", type=Path, default=None, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=None, help="results JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--quick", action="store_true", help="smaller corpora, for a smoke run")
+    args = parser.parse_args()
+
+    metrics = run_all(args.quick)
+    result = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "metrics": metrics,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("quick") != args.quick:
+            print("Warning: baseline was recorded with a different --quick setting")
+        if not compare(metrics, baseline["metrics"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import base64
+import gzip
+import json
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Артефакти впалих кроків: скріншот, DOM, URL і консоль браузера.
+# Синхронно (на критичному шляху) лише забираємо сирі дані з драйвера;
+# декодування base64, gzip і запис на диск — у фоновому пулі потоків.
+# Черга обмежена, розмір на диску теж: коли будь-що вичерпано, наступні
+# збої не знімаються взагалі — прогін не гальмує і диск не переповнюється.
+
+
+def _slug(text: str, limit: int = 40) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-")[:limit] or "step"
+
+
+class ArtifactWriter:
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = 200 * 1024 * 1024,
+        max_pending: int = 16,
+        workers: int = 2,
+    ):
+        self.directory = Path(directory)
+        # артефакти попереднього прогону не змішуються з новими
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="kwiga-artifacts"
+        )
+
+    def capture(self, driver, meta: Dict[str, Any]) -> Optional[str]:
+        """
+        Знімає стан драйвера і ставить запис у чергу. Повертає шлях
+        (без розширення), під яким з'являться файли, або None, якщо
+        черга повна чи ліміт розміру вичерпано.
+        """
+        with self._lock:
+            full = self.bytes_written >= self.max_bytes
+        if full or not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.dropped += 1
+            return None
+
+        try:
+            raw = _grab(driver)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self.dropped += 1
+            return None
+
+        with self._lock:
+            self._seq += 1
+            self.captured += 1
+            feature = _slug(Path(str(meta.get("feature", ""))).stem)
+            name = f"{self._seq:04d}-{feature}-L{meta.get('line', 0)}"
+        base = self.directory / name
+        self._executor.submit(self._write, base, raw, meta)
+        return str(base)
+
+    def _write(self, base: Path, raw: Dict[str, Any], meta: Dict[str, Any]):
+        try:
+            base.parent.mkdir(parents=True, exist_ok=True)
+            record = dict(meta)
+            record["url"] = raw.get("url")
+            record["console"] = raw.get("console") or []
+            record["captured_at"] = raw["captured_at"]
+            self._put(
+                base.with_suffix(".json"),
+                json.dumps(record, indent=2, ensure_ascii=False, default=str).encode("utf-8"),
+            )
+            if raw.get("screenshot"):
+                self._put(base.with_suffix(".png"), base64.b64decode(raw["screenshot"]))
+            if raw.get("source"):
+                self._put(
+                    base.with_suffix(".html.gz"),
+                    gzip.compress(raw["source"].encode("utf-8"), compresslevel=6),
+                )
+        except Exception as e:
+            print(f"[artifacts] failed to write {base}: {e}")
+        finally:
+            self._slots.release()
+
+    def _put(self, path: Path, data: bytes):
+        with self._lock:
+            if self.bytes_written + len(data) > self.max_bytes:
+                return
+            self.bytes_written += len(data)
+        path.write_bytes(data)
+
+    def close(self):
+        """Чекає, поки фонові записи завершаться."""
+        self._executor.shutdown(wait=True)
+
+    def report(self) -> str:
+        line = "Artifacts: {} failure(s) captured, {:.1f} MB in {}".format(
+            self.captured, self.bytes_written / 1024 / 1024, self.directory
+        )
+        if self.dropped:
+            line += f"; {self.dropped} skipped (queue full or size cap reached)"
+        return line
+
+
+def _grab(driver) -> Dict[str, Any]:
+    """Сирі дані з драйвера; кожна частина необов'язкова (напр. HttpDriver без скріншотів)."""
+    raw: Dict[str, Any] = {"captured_at": datetime.now(timezone.utc).isoformat()}
+    raw["url"] = driver.current_url
+    if hasattr(driver, "get_screenshot_as_base64"):
+        try:
+            raw["screenshot"] = driver.get_screenshot_as_base64()
+        except Exception:
+            pass
+    try:
+        raw["source"] = driver.page_source
+    except Exception:
+        pass
+    if hasattr(driver, "get_log"):
+        try:
+            # лише Chrome з goog:loggingPrefs; записи з моменту попереднього читання
+            raw["console"] = [
+                f"{entry.get('level')} {entry.get('message')}"
+                for entry in driver.get_log("browser")
+            ]
+        except Exception:
+            pass
+    return raw
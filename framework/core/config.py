@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 @dataclass
 class Config:
@@ -7,3 +8,48 @@ class Config:
     headless: bool = True
     implicit_wait: int = 5
     explicit_wait: int = 10
+    # скільки сценаріїв одна сесія браузера обслуговує до перезапуску
+    pool_max_uses: int = 20
+    # явний шлях до chromedriver/geckodriver (пропускає автовизначення)
+    driver_path: Optional[str] = None
+    # не ходити в мережу за драйвером: лише кеш, driver_path або PATH
+    offline_drivers: bool = False
+    # додаткові аргументи командного рядка браузера
+    browser_args: Tuple[str, ...] = ()
+    # аргументи, які розуміє лише Chrome (Firefox їх не отримує)
+    chrome_args: Tuple[str, ...] = ()
+    # профіль швидкодії браузера (див. driver_factory.PERFORMANCE_PROFILES),
+    # можна комбінувати через кому: "eager,block-third-party"
+    profile: str = "default"
+    # сценарії без JS-залежних кроків виконувати через HTTP (web/http_backend.py)
+    http_backend: bool = True
+    # після першого впалого кроку решта кроків сценарію пропускається
+    fail_fast: bool = False
+    # бюджети часу (секунди); завислий крок падає, драйвер викидається
+    step_timeout: Optional[float] = None
+    scenario_timeout: Optional[float] = None
+    # кожен сценарій — в окремому incognito browser context (CDP, лише Chrome)
+    isolate_contexts: bool = False
+    # однакові початкові кроки сценаріїв фічі виконуються один раз, далі —
+    # відновлення знімка стану браузера (див. runner._PrefixTreeRun)
+    share_prefixes: bool = False
+    # те саме, але лише між рядками одного Scenario Outline (увімкнено завжди,
+    # якщо не вимкнути --no-outline-sharing)
+    share_outline_prefixes: bool = True
+    # скріншот, DOM, URL і консоль впалих кроків -> reports/artifacts/
+    failure_artifacts: bool = True
+    artifacts_max_mb: int = 200
+    # браузер (з усіма дочірніми процесами), що розрісся понад стільки МБ RSS,
+    # перезапускається після сценарію; 0 — без ліміту
+    max_browser_rss_mb: int = 2048
+
+    def driver_options(self) -> dict:
+        """Аргументи для create_driver / DriverPool.acquire."""
+        return {
+            "implicit_wait": self.implicit_wait,
+            "driver_path": self.driver_path,
+            "offline": self.offline_drivers,
+            "extra_args": self.browser_args,
+            "chrome_args": self.chrome_args,
+            "profile": self.profile,
+        }
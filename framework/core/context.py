@@ -1,22 +1,295 @@
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Optional, Set, TextIO, Tuple
+from .artifacts import ArtifactWriter
 from .config import Config
-from framework.web.driver_factory import create_driver
+from framework.web.driver_factory import (
+    BrowserState,
+    DriverPool,
+    IsolatedContext,
+    capture_browser_state,
+    close_isolated_context,
+    create_driver,
+    open_isolated_context,
+    reset_driver_state,
+    restore_browser_state,
+)
+from framework.web.http_backend import BROWSER_BACKEND, HTTP_BACKEND, HttpDriver
+from framework.web.instrumentation import command_stats
+from framework.web.memory import MemoryStats
+from framework.web.snapshot import SnapshotServer
+from framework.web.waits import wait_new_window
+
+@dataclass
+class SavedState:
+    """Стан після спільного префікса сценаріїв: config і вкладка браузера."""
+    config: Config
+    # None — префікс не запускав браузер
+    browser: Optional[BrowserState] = None
+
 
 @dataclass
 class Context:
     config: Config = field(default_factory=Config)
     driver: Optional[object] = None
+    pool: Optional[DriverPool] = None
+    # локальний record/replay сервер замість живого сайту
+    snapshot: Optional[SnapshotServer] = None
+    # чим виконується поточний сценарій: браузер або HttpDriver
+    backend: str = BROWSER_BACKEND
+    # фоновий запис артефактів впалих кроків (None — вимкнено)
+    artifacts: Optional[ArtifactWriter] = None
+    # де ми зараз — для назв і опису артефактів
+    feature_path: Optional[Path] = None
+    scenario_name: str = ""
+    # лог поточної фічі (None -> stdout); паралельні воркери пишуть у буфер
+    out: Optional[TextIO] = None
+    # RSS браузерів і закриті "забуті" вкладки (спільний з пулом на прогін)
+    memory: Optional[MemoryStats] = None
+    _base_config: Config = field(init=False, repr=False)
+    # лічильники WebDriver-команд: накопичене з попередніх драйверів
+    # і стан статистики поточного драйвера на момент, коли ми його отримали
+    _commands_done: Tuple[int, float] = field(default=(0, 0.0), init=False, repr=False)
+    _commands_base: Tuple[int, float] = field(default=(0, 0.0), init=False, repr=False)
+    # браузер без пулу, відкладений на час HTTP-сценаріїв
+    _parked_driver: Optional[object] = field(default=None, init=False, repr=False)
+    # CDP browser context поточного сценарію (Config.isolate_contexts)
+    _isolated: Optional[IsolatedContext] = field(default=None, init=False, repr=False)
+    _isolation_checked: bool = field(default=False, init=False, repr=False)
+    # вкладки на початку сценарію (їх не закриваємо) і всі, які сценарій уже бачив
+    _scenario_handles: Optional[Tuple[str, ...]] = field(default=None, init=False, repr=False)
+    _main_handle: Optional[str] = field(default=None, init=False, repr=False)
+    _known_handles: Set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self):
+        # кроки на кшталт step_set_base_url змінюють config — зберігаємо
+        # початковий стан, щоб не переносити зміни між сценаріями
+        self._base_config = replace(self.config)
+
+    def site_url(self, url: str) -> str:
+        """URL сайту з урахуванням snapshot-режиму (живі хости -> локальний сервер)."""
+        if self.snapshot is None:
+            return url
+        return self.snapshot.rewrite_url(url)
 
     def init_driver(self):
         if self.driver is None:
-            self.driver = create_driver(
-                browser=self.config.browser,
-                headless=self.config.headless,
-                implicit_wait=self.config.implicit_wait,
-            )
+            if self.backend == HTTP_BACKEND:
+                driver = HttpDriver()
+            elif self.pool is not None:
+                driver = self.pool.acquire(
+                    browser=self.config.browser,
+                    headless=self.config.headless,
+                    **self.config.driver_options(),
+                )
+            else:
+                driver = create_driver(
+                    browser=self.config.browser,
+                    headless=self.config.headless,
+                    **self.config.driver_options(),
+                )
+            self._attach_driver(driver)
+        if not self._isolation_checked:
+            # раз на сценарій: драйвер без пулу переходить між сценаріями
+            self._isolation_checked = True
+            if self.backend == BROWSER_BACKEND and self.config.isolate_contexts:
+                self._open_isolation()
+        if self._scenario_handles is None and self.backend == BROWSER_BACKEND:
+            self._track_windows()
+
+    def _track_windows(self):
+        try:
+            self._scenario_handles = tuple(self.driver.window_handles)
+            self._main_handle = self.driver.current_window_handle
+        except Exception:
+            self._scenario_handles = ()
+        self._known_handles = set(self._scenario_handles)
+
+    def switch_to_new_window(self, timeout: float) -> bool:
+        """
+        Чекає на вкладку, якої сценарій ще не бачив, і перемикається на неї.
+        False — нова вкладка не з'явилась за timeout секунд.
+        """
+        self.init_driver()
+        handle = wait_new_window(self.driver, self._known_handles, timeout)
+        if handle is None:
+            return False
+        self._known_handles.add(handle)
+        self.driver.switch_to.window(handle)
+        return True
+
+    def _close_leaked_windows(self):
+        """
+        Закриває вкладки, відкриті сценарієм, і повертається на основну.
+        Інакше вони переходять у наступний сценарій разом з пам'яттю рендерера.
+        """
+        started = self._scenario_handles
+        if not started:
+            return
+        handles = self.driver.window_handles
+        leaked = [h for h in handles if h not in started]
+        if not leaked:
+            return
+        for handle in leaked:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        self.driver.switch_to.window(self._main_handle)
+        if self.memory is not None:
+            self.memory.add_leaked_tabs(len(leaked))
+
+    def _open_isolation(self):
+        try:
+            self._isolated = open_isolated_context(self.driver, self.config.profile)
+        except Exception as e:
+            # без ізоляції сценарій все одно працює — стан скине reset_driver_state
+            print(f"[context] browser context isolation unavailable: {e}", file=self.out)
+            self._isolated = None
+
+    def _close_isolation(self) -> bool:
+        """True — стан сценарію знищено разом з його browser context."""
+        isolated, self._isolated = self._isolated, None
+        if isolated is None:
+            return False
+        try:
+            close_isolated_context(self.driver, isolated)
+        except Exception:
+            return False
+        return True
+
+    def _attach_driver(self, driver):
+        stats = command_stats(driver)
+        self._commands_base = stats.snapshot() if stats is not None else (0, 0.0)
+        self.driver = driver
+
+    def _detach_driver(self):
+        self._isolated = None
+        self._scenario_handles = None
+        self._commands_done = self.command_snapshot()
+        driver, self.driver = self.driver, None
+        return driver
+
+    def command_snapshot(self) -> Tuple[int, float]:
+        """
+        (кількість, секунди) WebDriver-команд, виконаних через цей контекст.
+        Значення монотонне навіть якщо драйвер змінився (пул, перезапуск).
+        """
+        count, seconds = self._commands_done
+        stats = command_stats(self.driver)
+        if stats is not None:
+            now_count, now_seconds = stats.snapshot()
+            count += now_count - self._commands_base[0]
+            seconds += now_seconds - self._commands_base[1]
+        return count, seconds
+
+    def use_backend(self, backend: str):
+        """Перемикає бекенд для наступного сценарію (до begin_scenario)."""
+        if backend == self.backend:
+            return
+        if self.driver is not None:
+            if self.backend == BROWSER_BACKEND:
+                self._parked_driver = self._detach_driver()
+            else:
+                self._detach_driver().quit()
+        self.backend = backend
+        if backend == BROWSER_BACKEND and self._parked_driver is not None:
+            self._attach_driver(self._parked_driver)
+            self._parked_driver = None
+
+    def capture_failure(self, step, error: Exception) -> Optional[str]:
+        """
+        Артефакти впалого кроку (див. core/artifacts.py). Повертає базовий
+        шлях файлів або None; сам ніколи не падає.
+        """
+        if self.artifacts is None or self.driver is None:
+            return None
+        return self.artifacts.capture(
+            self.driver,
+            {
+                "feature": str(self.feature_path or ""),
+                "scenario": self.scenario_name,
+                "line": step.line_no,
+                "step": step.text,
+                "error": str(error),
+                "backend": self.backend,
+            },
+        )
+
+    def save_state(self) -> Optional[SavedState]:
+        """
+        Знімок для --share-prefixes. None — стан не зберегти (кілька вкладок,
+        помилка драйвера): сценарії тоді виконуються окремо.
+        """
+        browser = None
+        if self.driver is not None:
+            ignore = (self._isolated.home_handle,) if self._isolated is not None else ()
+            try:
+                browser = capture_browser_state(self.driver, ignore)
+            except Exception:
+                return None
+            if browser is None:
+                return None
+        return SavedState(replace(self.config), browser)
+
+    def restore_state(self, state: SavedState):
+        """Повертає контекст до знімка save_state (драйвер може бути вже інший)."""
+        if state.browser is None:
+            # префікс не чіпав браузер — наступна гілка починає з чистої сесії
+            self.end_scenario()
+            self._isolation_checked = False
+            self.config = replace(state.config)
+            return
+        self.config = replace(state.config)
+        self.init_driver()
+        restore_browser_state(self.driver, state.browser)
+
+    def begin_scenario(self):
+        self.config = replace(self._base_config)
+        self._isolation_checked = False
+        self._scenario_handles = None
+
+    def end_scenario(self, failed: bool = False):
+        """
+        Повертає драйвер у пул (пул сам скидає стан сесії).
+        Без пулу драйвер лишається, але його стан теж очищується.
+        failed=True — сесію не перевикористовуємо.
+        """
+        if self.driver is None:
+            return
+        if self.backend == HTTP_BACKEND:
+            # HttpDriver дешевий — кожен сценарій починає з чистих cookies
+            self._detach_driver().quit()
+            return
+        if failed:
+            self.quit_driver()
+            return
+
+        try:
+            self._close_leaked_windows()
+        except Exception:
+            self.quit_driver()
+            return
+
+        isolated = self._close_isolation()
+        if self.pool is not None:
+            self.pool.release(self._detach_driver(), reset=not isolated)
+            return
+        if self.memory is not None and self.memory.over_limit(self.driver):
+            # браузер розрісся — наступний сценарій отримає свіжий
+            self.quit_driver()
+        elif not isolated:
+            try:
+                reset_driver_state(self.driver)
+            except Exception:
+                self.quit_driver()
 
     def quit_driver(self):
+        if self._parked_driver is not None:
+            self.use_backend(BROWSER_BACKEND)
         if self.driver:
-            self.driver.quit()
-            self.driver = None
+            driver = self._detach_driver()
+            if self.backend == HTTP_BACKEND:
+                driver.quit()
+            elif self.pool is not None:
+                self.pool.release(driver, discard=True)
+            else:
+                driver.quit()
@@ -1,50 +1,143 @@
-from dataclasses import dataclass
-from typing import List
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+STEP_KEYWORDS = ("Given", "When", "Then", "And", "But")
+SCENARIO_KEYWORDS = ("scenario", "scenario outline", "scenario template")
+EXAMPLES_KEYWORDS = ("examples", "scenarios")
+
+# <назва> у кроках і назві Scenario Outline
+_PLACEHOLDER = re.compile(r"<([^<>]+)>")
 
 @dataclass
 class Step:
     keyword: str
     text: str
     line_no: int
+    source: str = ""
+
+@dataclass
+class Examples:
+    """Таблиця Examples: заголовок і рядки (номер рядка файлу, значення)."""
+    line_no: int
+    header: List[str] = field(default_factory=list)
+    rows: List[Tuple[int, List[str]]] = field(default_factory=list)
 
 @dataclass
 class Scenario:
     name: str
-    steps: List[Step]
+    steps: List[Step] = field(default_factory=list)
+    line_no: int = 0
+    # True — Scenario Outline: кроки з <плейсхолдерами>, рядки — в examples
+    outline: bool = False
+    examples: List[Examples] = field(default_factory=list)
+
+def placeholders(text: str) -> List[str]:
+    """Назви <плейсхолдерів> у тексті кроку або назві сценарію."""
+    return _PLACEHOLDER.findall(text)
+
+def _substitute(text: str, values: Dict[str, str]) -> str:
+    # невідомий плейсхолдер лишається як є; compile_feature повідомляє про нього
+    return _PLACEHOLDER.sub(lambda m: values.get(m.group(1), m.group(0)), text)
+
+def expand_outline(outline: Scenario) -> Iterator[Scenario]:
+    """
+    Розгортає Scenario Outline в окремі сценарії — по одному на рядок Examples,
+    лениво (при компіляції, у кеші парсера лишається сам шаблон).
+    line_no сценарію — рядок таблиці. Назва без <плейсхолдерів> отримує
+    значення рядка в дужках: за назвою працюють --last-failed і звіти.
+    """
+    for examples in outline.examples:
+        for row_line, cells in examples.rows:
+            values = dict(zip(examples.header, cells))
+            name = _substitute(outline.name, values)
+            if name == outline.name:
+                name = "{} [{}]".format(
+                    name, ", ".join(f"{key}={value}" for key, value in values.items())
+                )
+            steps = [
+                Step(st.keyword, _substitute(st.text, values), st.line_no, st.source)
+                for st in outline.steps
+            ]
+            yield Scenario(name=name, steps=steps, line_no=row_line)
+
+def _table_cells(line: str) -> List[str]:
+    # "| a | b |" -> ["a", "b"]; "\|" — символ | всередині комірки
+    cells = re.split(r"(?<!\\)\|", line.strip()[1:])
+    if cells and not cells[-1].strip():
+        cells = cells[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in cells]
 
 @dataclass
 class Feature:
     name: str
     scenarios: List[Scenario]
+    source: str = ""
 
-def parse_feature(content: str) -> Feature:
-    lines = content.splitlines()
-    feature_name = "Unnamed feature"
+def parse_lines(lines: Iterable[str], source: str = "<string>",
+                default_name: Optional[str] = None) -> Feature:
+    """
+    Інкрементальний парсер: читає рядки по одному (можна передати відкритий файл).
+    - "Feature: ..."  -> назва фічі
+    - "Scenario: ..." -> назва сценарію
+    - "Scenario Outline: ..." + "Examples:" з таблицею "| a | b |" -> шаблон,
+      який розгортає expand_outline
+    - Given/When/Then/And/But ... -> кроки (з ключовим словом, рядком і файлом)
+    Кроки поза сценарієм ігноруються.
+    """
+    feature_name = None
     scenarios: List[Scenario] = []
-    current_scenario = None
-    current_steps: List[Step] = []
+    current_scenario: Optional[Scenario] = None
+    current_examples: Optional[Examples] = None
 
     for i, raw in enumerate(lines, start=1):
         line = raw.strip()
         if not line or line.startswith("#"):
             continue
-        if line.lower().startswith("feature:"):
-            feature_name = line.split(":", 1)[1].strip()
-        elif line.lower().startswith("scenario:"):
-            if current_scenario:
-                current_scenario.steps = current_steps
-                scenarios.append(current_scenario)
-                current_steps = []
-            name = line.split(":", 1)[1].strip()
-            current_scenario = Scenario(name=name, steps=[])
-        elif any(line.startswith(k) for k in ("Given", "When", "Then", "And")):
+
+        if line.startswith("|"):
+            if current_examples is None:
+                continue
+            if current_examples.header:
+                current_examples.rows.append((i, _table_cells(line)))
+            else:
+                current_examples.header = _table_cells(line)
+            continue
+
+        head, sep, rest = line.partition(":")
+        keyword = " ".join(head.lower().split())
+        if sep and keyword == "feature":
+            feature_name = rest.strip()
+        elif sep and keyword in SCENARIO_KEYWORDS:
+            current_scenario = Scenario(
+                name=rest.strip(), line_no=i, outline=keyword != "scenario"
+            )
+            current_examples = None
+            scenarios.append(current_scenario)
+        elif sep and keyword in EXAMPLES_KEYWORDS and current_scenario is not None:
+            current_examples = Examples(line_no=i)
+            current_scenario.examples.append(current_examples)
+        else:
             parts = line.split(" ", 1)
-            keyword = parts[0]
-            text = parts[1].strip() if len(parts) > 1 else ""
-            current_steps.append(Step(keyword=keyword, text=text, line_no=i))
+            if parts[0] not in STEP_KEYWORDS or current_scenario is None:
+                continue
+            text = parts[1].strip() if len(parts) == 2 else ""
+            if text:
+                current_scenario.steps.append(
+                    Step(keyword=parts[0], text=text, line_no=i, source=source)
+                )
+
+    return Feature(
+        name=feature_name or default_name or "Unnamed feature",
+        scenarios=scenarios,
+        source=source,
+    )
 
-    if current_scenario:
-        current_scenario.steps = current_steps
-        scenarios.append(current_scenario)
+def parse_feature(content: str, source: str = "<string>") -> Feature:
+    return parse_lines(content.splitlines(), source)
 
-    return Feature(name=feature_name, scenarios=scenarios)
+def parse_feature_file(path: Path) -> Feature:
+    path = Path(path)
+    with path.open(encoding="utf-8") as f:
+        return parse_lines(f, str(path), default_name=path.name)
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Tuple
+
+from framework.core.dsl_parser import Examples, Feature, Scenario, Step, parse_lines
+
+# змінюйте при зміні структури Feature/Scenario/Step — старий кеш відкинеться
+CACHE_VERSION = 2
+
+
+# Фічі зберігаються як вкладені кортежі: pickle розбирає їх у рази швидше,
+# ніж десятки тисяч dataclass-об'єктів, а Feature відновлюється лише для
+# тих файлів, які реально запитали.
+def _encode(feature: Feature) -> tuple:
+    return (
+        feature.name,
+        feature.source,
+        tuple(
+            (
+                scenario.name,
+                scenario.line_no,
+                tuple((st.keyword, st.text, st.line_no) for st in scenario.steps),
+                scenario.outline,
+                tuple(
+                    (
+                        ex.line_no,
+                        tuple(ex.header),
+                        tuple((line, tuple(cells)) for line, cells in ex.rows),
+                    )
+                    for ex in scenario.examples
+                ),
+            )
+            for scenario in feature.scenarios
+        ),
+    )
+
+
+def _decode(data: tuple) -> Feature:
+    name, source, scenarios = data
+    return Feature(
+        name=name,
+        source=source,
+        scenarios=[
+            Scenario(
+                name=scenario_name,
+                line_no=line_no,
+                steps=[Step(kw, text, step_line, source) for kw, text, step_line in steps],
+                outline=outline,
+                examples=[
+                    Examples(ex_line, list(header), [(line, list(cells)) for line, cells in rows])
+                    for ex_line, header, rows in examples
+                ],
+            )
+            for scenario_name, line_no, steps, outline, examples in scenarios
+        ],
+    )
+
+
+class ParseCache:
+    """
+    Дисковий кеш розпарсених фіч.
+    Ключ — шлях до файлу; запис валідний, якщо збігаються mtime і розмір.
+    Якщо mtime змінився (напр. після git checkout), порівнюємо sha1 вмісту
+    і парсимо заново лише при реальній зміні.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Tuple[int, int, str, tuple]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with self.path.open("rb") as f:
+                version, entries = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            # пошкоджений або несумісний кеш — просто перебудуємо
+            return
+        if version == CACHE_VERSION:
+            self._entries = entries
+
+    def get(self, feature_path: Path) -> Feature:
+        feature_path = Path(feature_path)
+        key = os.path.abspath(feature_path)
+        stat = feature_path.stat()
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self.hits += 1
+            return _decode(entry[3])
+
+        data = feature_path.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        if entry is not None and entry[2] == digest:
+            encoded = entry[3]
+            feature = _decode(encoded)
+            self.hits += 1
+        else:
+            feature = parse_lines(
+                data.decode("utf-8").splitlines(),
+                str(feature_path),
+                default_name=feature_path.name,
+            )
+            encoded = _encode(feature)
+            self.misses += 1
+
+        self._entries[key] = (stat.st_mtime_ns, stat.st_size, digest, encoded)
+        self._dirty = True
+        return feature
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump((CACHE_VERSION, self._entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,249 @@
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from framework.core.dsl_parser import Feature, Scenario, expand_outline, placeholders
+from framework.core.steps_registry import StepsRegistry
+from framework.web.http_backend import BROWSER_BACKEND, HTTP_BACKEND
+
+
+@dataclass
+class BoundStep:
+    """Крок, заздалегідь прив'язаний до визначення в StepsRegistry."""
+    text: str
+    definition: int
+    match: re.Match
+    keyword: str = ""
+    line_no: int = 0
+
+
+@dataclass
+class ScenarioPlan:
+    name: str
+    steps: List[BoundStep] = field(default_factory=list)
+    # "http" — усі кроки вміють працювати без браузера (HttpDriver)
+    backend: str = BROWSER_BACKEND
+    # рядок Scenario Outline у файлі; однаковий для всіх рядків Examples
+    outline: Optional[int] = None
+
+
+@dataclass
+class FeaturePlan:
+    name: str
+    path: Path
+    scenarios: List[ScenarioPlan] = field(default_factory=list)
+
+
+@dataclass
+class PrefixNode:
+    """
+    Вузол дерева спільних префіксів сценаріїв (--share-prefixes).
+    steps — кроки від попереднього розгалуження, однакові для всіх сценаріїв
+    піддерева; depth — довжина префікса від кореня разом з ними.
+    """
+    steps: List[BoundStep] = field(default_factory=list)
+    depth: int = 0
+    # усі сценарії піддерева (індекси у FeaturePlan.scenarios)
+    scenarios: List[int] = field(default_factory=list)
+    # сценарії, чий спільний префікс закінчується тут; далі — власні кроки
+    ends: List[int] = field(default_factory=list)
+    children: List["PrefixNode"] = field(default_factory=list)
+
+
+def build_prefix_tree(
+    scenarios: List[ScenarioPlan],
+    indices: Sequence[int],
+    shareable: Callable[[BoundStep], bool],
+    depth: int = 0,
+) -> PrefixNode:
+    """
+    Дерево однакових послідовностей кроків: ланцюжки без розгалужень
+    стиснуті в один вузол. Кроки однакові, якщо прив'язані до того самого
+    визначення з тим самим текстом; у префікс входять лише shareable-кроки.
+    """
+    def key(index: int, position: int):
+        steps = scenarios[index].steps
+        if position >= len(steps) or not shareable(steps[position]):
+            return None
+        return steps[position].definition, steps[position].text
+
+    node = PrefixNode(depth=depth, scenarios=list(indices))
+    if len(indices) == 1:
+        # у сценарію без "сусідів" далі все — власні кроки
+        node.ends.append(indices[0])
+        return node
+
+    while True:
+        keys = {key(i, depth) for i in indices}
+        if len(keys) != 1 or None in keys:
+            break
+        node.steps.append(scenarios[indices[0]].steps[depth])
+        depth += 1
+    node.depth = depth
+
+    branches: Dict[Tuple[int, str], List[int]] = {}
+    for i in indices:
+        step_key = key(i, depth)
+        if step_key is None:
+            node.ends.append(i)
+        else:
+            branches.setdefault(step_key, []).append(i)
+    node.children = [
+        build_prefix_tree(scenarios, group, shareable, depth)
+        for group in branches.values()
+    ]
+    return node
+
+
+def prefix_groups(
+    plan: FeaturePlan,
+    shareable: Callable[[BoundStep], bool],
+    outlines_only: bool = False,
+) -> List[Tuple[int, Optional[PrefixNode]]]:
+    """
+    Порядок виконання фічі для --share-prefixes: (індекс сценарію, None) —
+    звичайний сценарій, (індекс першого, вузол) — група зі спільним префіксом.
+    Групуються лише браузерні сценарії; HTTP-сценарії і так дешеві.
+    outlines_only=True — префікси діляться лише між рядками одного
+    Scenario Outline.
+    """
+    browser = [
+        i for i, sc in enumerate(plan.scenarios) if sc.backend == BROWSER_BACKEND
+    ]
+    if outlines_only:
+        outlines: Dict[int, List[int]] = {}
+        for i in browser:
+            if plan.scenarios[i].outline is not None:
+                outlines.setdefault(plan.scenarios[i].outline, []).append(i)
+        roots = [
+            build_prefix_tree(plan.scenarios, rows, shareable)
+            for rows in outlines.values()
+            if len(rows) > 1
+        ]
+    else:
+        roots = [build_prefix_tree(plan.scenarios, browser, shareable)]
+    nodes = [node for root in roots for node in ([root] if root.steps else root.children)]
+    units: List[Tuple[int, Optional[PrefixNode]]] = [
+        (node.scenarios[0], node) for node in nodes if len(node.scenarios) > 1
+    ]
+    grouped = {i for _, node in units for i in node.scenarios}
+    units.extend((i, None) for i in range(len(plan.scenarios)) if i not in grouped)
+    units.sort(key=lambda unit: unit[0])
+    return units
+
+
+@dataclass
+class CompileIssue:
+    """Невизначений/неоднозначний крок або помилка Scenario Outline, знайдені під час компіляції."""
+    path: Path
+    line_no: int
+    scenario: str
+    text: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'{self.path}:{self.line_no} :: Scenario "{self.scenario}" :: {self.message}'
+
+
+def compile_feature(
+    feature: Feature, path: Path, registry: StepsRegistry, allow_http: bool = True
+) -> Tuple[FeaturePlan, List[CompileIssue]]:
+    """
+    Прив'язує кожен крок розпарсеної фічі до його обробника і груп match.
+    Не зупиняється на першій помилці — повертає всі проблемні кроки.
+    allow_http=True — сценарії з лише http-сумісних кроків
+    виконуються через HttpDriver замість браузера.
+    Scenario Outline розгортається тут: кожен рядок Examples — окремий сценарій.
+    """
+    plan = FeaturePlan(name=feature.name, path=path)
+    issues: List[CompileIssue] = []
+
+    for scenario_def in feature.scenarios:
+        if not (scenario_def.outline or scenario_def.examples):
+            plan.scenarios.append(
+                _bind_scenario(scenario_def, path, registry, allow_http, issues)
+            )
+            continue
+        issues.extend(_outline_issues(scenario_def, path))
+        rows = 0
+        for row in expand_outline(scenario_def):
+            scenario = _bind_scenario(row, path, registry, allow_http, issues)
+            scenario.outline = scenario_def.line_no
+            plan.scenarios.append(scenario)
+            rows += 1
+        if not rows:
+            issues.append(
+                CompileIssue(
+                    path,
+                    scenario_def.line_no,
+                    scenario_def.name,
+                    scenario_def.name,
+                    "Scenario Outline has no Examples rows",
+                )
+            )
+
+    return plan, issues
+
+
+def _outline_issues(outline: Scenario, path: Path) -> List[CompileIssue]:
+    """
+    Помилки шаблону, які інакше вилізли б лише під час прогону: <плейсхолдер>
+    без колонки в Examples (лишився б текстом і зв'язався б з "(.+)") і рядки
+    таблиці з іншою кількістю комірок, ніж у заголовку.
+    """
+    found: List[CompileIssue] = []
+    for examples in outline.examples:
+        columns = set(examples.header)
+        for step in outline.steps:
+            for name in placeholders(step.text):
+                if name not in columns:
+                    found.append(
+                        CompileIssue(
+                            path,
+                            step.line_no,
+                            outline.name,
+                            step.text,
+                            f"Unknown placeholder <{name}>: Examples at line "
+                            f"{examples.line_no} has no such column",
+                        )
+                    )
+        for line_no, cells in examples.rows:
+            if len(cells) != len(examples.header):
+                found.append(
+                    CompileIssue(
+                        path,
+                        line_no,
+                        outline.name,
+                        " | ".join(cells),
+                        f"Examples row has {len(cells)} cell(s), "
+                        f"header has {len(examples.header)}",
+                    )
+                )
+    return found
+
+
+def _bind_scenario(
+    scenario_def: Scenario,
+    path: Path,
+    registry: StepsRegistry,
+    allow_http: bool,
+    issues: List[CompileIssue],
+) -> ScenarioPlan:
+    scenario = ScenarioPlan(name=scenario_def.name)
+    for step in scenario_def.steps:
+        try:
+            definition, match = registry.match(step.text)
+        except ValueError as e:
+            issues.append(
+                CompileIssue(path, step.line_no, scenario.name, step.text, str(e))
+            )
+            continue
+        scenario.steps.append(
+            BoundStep(step.text, definition, match, step.keyword, step.line_no)
+        )
+    if allow_http and scenario.steps and all(
+        registry.supports_http(st) for st in scenario.steps
+    ):
+        scenario.backend = HTTP_BACKEND
+    return scenario
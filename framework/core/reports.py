@@ -0,0 +1,237 @@
+import heapq
+import json
+import os
+import shutil
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+# Звіти пишуться потоково: кожен sink отримує результат фічі одразу після
+# її завершення (feature_finished) і нічого не тримає в пам'яті, крім
+# лічильників; close() дописує файл у кінці прогону.
+
+
+class ResultSink:
+    """Базовий sink: отримує результати фіч по мірі готовності."""
+
+    def feature_finished(self, feature_result: Dict[str, Any]):
+        pass
+
+    def close(self, wall_time: float, extra: Optional[Dict[str, Any]] = None):
+        pass
+
+
+def _scenario_failure_text(scenario) -> str:
+    lines = []
+    for step in scenario.steps:
+        if step.status == "failed":
+            lines.append(f"line {step.line_no}: {step.text}\n    {step.error}")
+            if step.artifact:
+                lines.append(f"    artifacts: {step.artifact}.*")
+    return "\n".join(lines)
+
+
+def _step_dict(st) -> Dict[str, Any]:
+    step = {
+        "text": st.text,
+        "line": st.line_no,
+        "passed": st.passed,
+        "status": st.status,
+        "duration": round(st.duration, 4),
+        "commands": st.commands,
+        "command_time": round(st.command_time, 4),
+    }
+    if st.artifact:
+        step["artifact"] = st.artifact
+    return step
+
+
+def _scenario_dict(scenario) -> Dict[str, Any]:
+    return {
+        "name": scenario.name,
+        "passed": scenario.passed,
+        "attempts": scenario.attempts,
+        "flaky": scenario.flaky,
+        "duration": round(scenario.duration, 3),
+        "steps": [_step_dict(st) for st in scenario.steps],
+    }
+
+
+class JUnitSink(ResultSink):
+    """
+    JUnit XML: фіча -> testsuite, сценарій -> testcase.
+    testsuite-и пишуться в тимчасовий файл одразу; загальні лічильники
+    кореневого testsuites відомі лише в кінці, тож close() збирає файл.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._parts_path = self.path.with_suffix(".parts")
+        self._parts = self._parts_path.open("w", encoding="utf-8")
+        self.tests = self.failures = 0
+        self.time = 0.0
+
+    def feature_finished(self, fr: Dict[str, Any]):
+        scenarios = fr["scenario_results"]
+        failures = sum(1 for s in scenarios if not s.passed)
+        suite = ET.Element(
+            "testsuite",
+            name=fr["feature_name"],
+            file=str(fr["path"]),
+            tests=str(len(scenarios)),
+            failures=str(failures),
+            errors="0",
+            time=f"{fr['duration']:.3f}",
+        )
+        for scenario in scenarios:
+            case = ET.SubElement(
+                suite,
+                "testcase",
+                classname=fr["feature_name"],
+                name=scenario.name,
+                time=f"{scenario.duration:.3f}",
+            )
+            if not scenario.passed:
+                failed_step = next(st for st in scenario.steps if st.status == "failed")
+                failure = ET.SubElement(
+                    case, "failure", message=failed_step.error or "step failed"
+                )
+                failure.text = _scenario_failure_text(scenario)
+            out = ET.SubElement(case, "system-out")
+            flaky_note = (
+                [f"FLAKY: passed on attempt {scenario.attempts}"] if scenario.flaky else []
+            )
+            out.text = "\n".join(
+                flaky_note
+                + [
+                    "{} {} ({:.3f}s, {} WebDriver commands)".format(
+                        st.status.upper(), st.text, st.duration, st.commands
+                    )
+                    for st in scenario.steps
+                ]
+            )
+        self._parts.write(ET.tostring(suite, encoding="unicode"))
+
+        self.tests += len(scenarios)
+        self.failures += failures
+        self.time += fr["duration"]
+
+    def close(self, wall_time: float, extra: Optional[Dict[str, Any]] = None):
+        self._parts.close()
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            f.write(
+                "<testsuites name={} tests={} failures={} time={}>".format(
+                    quoteattr("kwiga-bdd"),
+                    quoteattr(str(self.tests)),
+                    quoteattr(str(self.failures)),
+                    quoteattr(f"{self.time:.3f}"),
+                )
+            )
+            with self._parts_path.open(encoding="utf-8") as parts:
+                shutil.copyfileobj(parts, f)
+            f.write("</testsuites>")
+        os.replace(tmp, self.path)
+        self._parts_path.unlink()
+
+
+class TimingProfileSink(ResultSink):
+    """
+    JSON-профіль (timings.json): час фіч, сценаріїв і кроків + WebDriver-команди.
+    Фічі дописуються в масив "features" одразу; extra з close() — додаткові
+    секції верхнього рівня (напр. page_loads по профілях).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_suffix(".tmp")
+        self._file = self._tmp.open("w", encoding="utf-8")
+        self._file.write(
+            '{\n  "generated_at": %s,\n  "features": ['
+            % json.dumps(datetime.now(timezone.utc).isoformat())
+        )
+        self._first = True
+
+    def feature_finished(self, fr: Dict[str, Any]):
+        feature = {
+            "name": fr["feature_name"],
+            "path": str(fr["path"]),
+            "duration": round(fr["duration"], 3),
+            "scenarios": [_scenario_dict(s) for s in fr["scenario_results"]],
+        }
+        self._file.write(("\n    " if self._first else ",\n    "))
+        self._file.write(json.dumps(feature, ensure_ascii=False))
+        self._first = False
+
+    def close(self, wall_time: float, extra: Optional[Dict[str, Any]] = None):
+        self._file.write("\n  ],\n  \"wall_time\": %s" % json.dumps(round(wall_time, 3)))
+        for key, value in (extra or {}).items():
+            self._file.write(
+                ",\n  %s: %s" % (json.dumps(key), json.dumps(value, ensure_ascii=False))
+            )
+        self._file.write("\n}\n")
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+
+class JsonlSink(ResultSink):
+    """results.jsonl: один рядок JSON на сценарій, пишеться одразу."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("w", encoding="utf-8")
+
+    def feature_finished(self, fr: Dict[str, Any]):
+        for scenario in fr["scenario_results"]:
+            record = {"feature": fr["feature_name"], "path": str(fr["path"])}
+            record.update(_scenario_dict(scenario))
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self, wall_time: float, extra: Optional[Dict[str, Any]] = None):
+        self._file.close()
+
+
+class SlowestStepsSink(ResultSink):
+    """Тримає лише top найповільніших кроків (heap обмеженого розміру)."""
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self._heap: List[Tuple[float, int, tuple]] = []
+        self._seq = 0
+
+    def feature_finished(self, fr: Dict[str, Any]):
+        if self.top <= 0:
+            return
+        path = str(fr["path"])
+        for scenario in fr["scenario_results"]:
+            for st in scenario.steps:
+                entry = (
+                    st.duration,
+                    self._seq,
+                    (st.commands, st.command_time, path, st.line_no, st.text),
+                )
+                self._seq += 1
+                if len(self._heap) < self.top:
+                    heapq.heappush(self._heap, entry)
+                elif entry[0] > self._heap[0][0]:
+                    heapq.heapreplace(self._heap, entry)
+
+    def close(self, wall_time: float, extra: Optional[Dict[str, Any]] = None):
+        slowest = sorted(self._heap, key=lambda e: (-e[0], e[1]))
+        if not slowest:
+            return
+
+        print(f"\n=========== TOP {len(slowest)} SLOWEST STEPS ===========")
+        for duration, _, (commands, command_time, path, line_no, text) in slowest:
+            print(
+                "{:8.2f}s  {:4d} cmds {:7.2f}s  {}:{}  {}".format(
+                    duration, commands, command_time, Path(path).name, line_no, text
+                )
+            )
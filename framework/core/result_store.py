@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+# що впливає на результат сценарію, крім самого .kwiga файлу:
+# парсер, план і раннер, визначення кроків, page objects і веб-хелпери
+FINGERPRINT_SOURCES = (
+    "framework/core",
+    "framework/pages",
+    "framework/web",
+)
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def code_fingerprint(project_root: Path, sources: Iterable[str] = FINGERPRINT_SOURCES) -> str:
+    """sha1 по всіх .py файлах із sources (шляхи відносно кореня проєкту)."""
+    digest = hashlib.sha1()
+    files = []
+    for source in sources:
+        path = Path(project_root) / source
+        files.extend([path] if path.is_file() else sorted(path.rglob("*.py")))
+    for path in files:
+        digest.update(path.relative_to(project_root).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    Локальна база результатів останнього прогону (JSON): для кожної фічі —
+    хеш вмісту файлу, відбиток коду кроків і статус кожного сценарію.
+    Використовується для --last-failed, --changed і --failed-first.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.features: Dict[str, dict] = {}
+        # фіча -> сценарій -> {"runs", "flaky", "failed"}; на відміну від
+        # статусів, не скидається при зміні файлу фічі
+        self.flakiness: Dict[str, Dict[str, Dict[str, int]]] = {}
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            self.features = data.get("features", {})
+            self.flakiness = data.get("flakiness", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def failed_scenarios(self, key: str) -> Tuple[str, ...]:
+        entry = self.features.get(key, {})
+        return tuple(
+            name for name, status in entry.get("scenarios", {}).items() if status == "failed"
+        )
+
+    def is_changed(self, key: str, content_hash: str, fingerprint: str) -> bool:
+        """Фіча нова, змінилась сама або змінився код кроків з останнього прогону."""
+        entry = self.features.get(key)
+        return (
+            entry is None
+            or entry.get("hash") != content_hash
+            or entry.get("code") != fingerprint
+        )
+
+    def record(
+        self,
+        key: str,
+        content_hash: str,
+        fingerprint: str,
+        scenarios: Dict[str, bool],
+    ):
+        """
+        scenarios: назва -> пройшов. Якщо запускали лише частину сценаріїв
+        (--last-failed), статуси решти зберігаються, поки фіча не змінилась.
+        """
+        entry = self.features.get(key)
+        if entry is None or entry.get("hash") != content_hash:
+            entry = self.features[key] = {"scenarios": {}}
+        entry["hash"] = content_hash
+        entry["code"] = fingerprint
+        for name, passed in scenarios.items():
+            entry["scenarios"][name] = "passed" if passed else "failed"
+
+    def record_attempts(self, key: str, scenario: str, passed: bool, attempts: int):
+        """Статистика нестабільності: flaky — пройшов лише з повторної спроби."""
+        stats = self.flakiness.setdefault(key, {}).setdefault(
+            scenario, {"runs": 0, "flaky": 0, "failed": 0}
+        )
+        stats["runs"] += 1
+        if not passed:
+            stats["failed"] += 1
+        elif attempts > 1:
+            stats["flaky"] += 1
+
+    def flakiness_report(self) -> List[dict]:
+        """Сценарії, що хоч раз були нестабільними, від найгіршого."""
+        rows = [
+            {
+                "feature": key,
+                "scenario": scenario,
+                **stats,
+                "flaky_rate": round(stats["flaky"] / stats["runs"], 3),
+            }
+            for key, scenarios in self.flakiness.items()
+            for scenario, stats in scenarios.items()
+            if stats["runs"] and stats["flaky"]
+        ]
+        rows.sort(key=lambda row: (-row["flaky_rate"], -row["flaky"], row["feature"]))
+        return rows
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"version": 1, "features": self.features, "flakiness": self.flakiness},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        os.replace(tmp, self.path)
@@ -0,0 +1,128 @@
+from typing import Any, Dict, List, Optional
+
+# Результати з __slots__: на великих згенерованих наборах (десятки тисяч
+# сценаріїв) їх створюються мільйони, а живуть вони лише до запису в sinks.
+
+
+class StepResult:
+    __slots__ = (
+        "text",
+        "passed",
+        "error",
+        "line_no",
+        "duration",
+        "commands",
+        "command_time",
+        "skipped",
+        "artifact",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        passed: bool,
+        error: Optional[str] = None,
+        line_no: int = 0,
+        duration: float = 0.0,
+        commands: int = 0,
+        command_time: float = 0.0,
+        skipped: bool = False,
+        artifact: Optional[str] = None,
+    ):
+        self.text = text
+        self.passed = passed
+        self.error = error
+        self.line_no = line_no
+        # час кроку і WebDriver-команди, які він виконав (секунди)
+        self.duration = duration
+        self.commands = commands
+        self.command_time = command_time
+        # крок не виконувався: попередній крок сценарію впав (fail-fast)
+        # або вичерпано бюджет часу
+        self.skipped = skipped
+        # базовий шлях файлів reports/artifacts/... для впалого кроку
+        self.artifact = artifact
+
+    @property
+    def status(self) -> str:
+        if self.skipped:
+            return "skipped"
+        return "passed" if self.passed else "failed"
+
+
+class ScenarioResult:
+    __slots__ = ("name", "steps", "duration", "attempts")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.steps: List[StepResult] = []
+        self.duration = 0.0
+        # номер спроби, якою отримано цей результат (див. retry_failed_scenarios)
+        self.attempts = 1
+
+    @property
+    def flaky(self) -> bool:
+        """Пройшов лише з повторної спроби."""
+        return self.passed and self.attempts > 1
+
+    @property
+    def passed(self) -> bool:
+        # сценарій вважаємо успішним, якщо жоден крок не впав
+        # (пропущені кроки бувають лише після впалого)
+        return all(step.passed or step.skipped for step in self.steps)
+
+
+class RunCounters:
+    """
+    Лічильники для підсумків, що оновлюються по мірі надходження результатів:
+    підсумок у кінці прогону не проходить по всіх сценаріях і кроках знову.
+    """
+
+    __slots__ = (
+        "features",
+        "scenarios",
+        "scenarios_passed",
+        "steps",
+        "steps_passed",
+        "steps_skipped",
+        "flaky",
+    )
+
+    def __init__(self):
+        self.features = 0
+        self.scenarios = 0
+        self.scenarios_passed = 0
+        self.steps = 0
+        self.steps_passed = 0
+        self.steps_skipped = 0
+        # назви сценаріїв, що пройшли лише з повторної спроби
+        self.flaky: List[str] = []
+
+    @property
+    def scenarios_failed(self) -> int:
+        return self.scenarios - self.scenarios_passed
+
+    @property
+    def steps_failed(self) -> int:
+        return self.steps - self.steps_passed - self.steps_skipped
+
+    def add_scenario(self, scenario: ScenarioResult):
+        self.scenarios += 1
+        passed = True
+        for step in scenario.steps:
+            self.steps += 1
+            if step.skipped:
+                self.steps_skipped += 1
+            elif step.passed:
+                self.steps_passed += 1
+            else:
+                passed = False
+        if passed:
+            self.scenarios_passed += 1
+            if scenario.attempts > 1:
+                self.flaky.append(scenario.name)
+
+    def add_feature(self, feature_result: Dict[str, Any]):
+        self.features += 1
+        for scenario in feature_result["scenario_results"]:
+            self.add_scenario(scenario)
@@ -1,6 +1,13 @@
+import argparse
+import io
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Iterator, Optional, TextIO, Tuple
 
 try:
     from framework.core.context import TestContext
@@ -20,7 +27,29 @@ except ImportError:
             "у модулі framework.core.context"
         )
 
+from framework.core.artifacts import ArtifactWriter
+from framework.core.config import Config
+from framework.core.dsl_parser import parse_feature_file
+from framework.core.parse_cache import ParseCache
+from framework.core.plan import (
+    BoundStep,
+    CompileIssue,
+    FeaturePlan,
+    PrefixNode,
+    ScenarioPlan,
+    compile_feature,
+    prefix_groups,
+)
+from framework.core.result_store import ResultStore, code_fingerprint, file_hash
+from framework.core.reports import JsonlSink, JUnitSink, SlowestStepsSink, TimingProfileSink
+from framework.core.results import RunCounters, ScenarioResult, StepResult
+from framework.core.scheduler import TimingDB, longest_first, parse_shard, shard
 from framework.core.steps_registry import StepsRegistry
+from framework.web.driver_factory import PERFORMANCE_PROFILES, DriverPool, resolve_profile
+from framework.web.memory import MemoryStats, rss_available
+from framework.web.http_backend import BROWSER_BACKEND, HTTP_BACKEND
+from framework.web.page_metrics import page_metrics_log
+from framework.web.snapshot import DEFAULT_HOSTS, SnapshotServer
 
 # ANSI-кольори для трохи красивішого логування
 GREEN = "\033[92m"
@@ -29,210 +58,1198 @@ YELLOW = "\033[93m"
 RESET = "\033[0m"
 
 
-class StepResult:
-    def __init__(self, text: str, passed: bool, error: Optional[str] = None):
-        self.text = text
-        self.passed = passed
+def plan_step_count(plan: FeaturePlan) -> int:
+    return sum(len(scenario.steps) for scenario in plan.scenarios)
+
+
+def compile_feature_files(
+    feature_files: List[Path],
+    registry: StepsRegistry,
+    cache: Optional[ParseCache] = None,
+    allow_http: bool = True,
+) -> Tuple[List[FeaturePlan], List[CompileIssue]]:
+    """Парсить і компілює всі фічі до запуску будь-якого браузера."""
+    plans: List[FeaturePlan] = []
+    issues: List[CompileIssue] = []
+    for path in feature_files:
+        feature = cache.get(path) if cache is not None else parse_feature_file(path)
+        plan, feature_issues = compile_feature(feature, path, registry, allow_http)
+        plans.append(plan)
+        issues.extend(feature_issues)
+    if cache is not None:
+        cache.save()
+    return plans, issues
+
+
+def select_plans(
+    plans: List[FeaturePlan],
+    store: ResultStore,
+    key: Callable[[FeaturePlan], str],
+    content_hash: Callable[[FeaturePlan], str],
+    fingerprint: str,
+    last_failed: bool = False,
+    changed: bool = False,
+) -> List[FeaturePlan]:
+    """
+    --last-failed: лише сценарії, що впали минулого разу;
+    --changed: цілі фічі, які змінились (або змінився код кроків).
+    Разом — об'єднання. Нічого не вибрано — порожній список.
+    """
+    selected: List[FeaturePlan] = []
+    for plan in plans:
+        if changed and store.is_changed(key(plan), content_hash(plan), fingerprint):
+            selected.append(plan)
+            continue
+        if last_failed:
+            failed = set(store.failed_scenarios(key(plan)))
+            scenarios = [sc for sc in plan.scenarios if sc.name in failed]
+            if scenarios:
+                selected.append(replace(plan, scenarios=scenarios))
+    return selected
+
+
+def run_feature_file(
+    ctx, steps: StepsRegistry, path: Path, out: Optional[TextIO] = None
+) -> Dict[str, Any]:
+    plan, issues = compile_feature(parse_feature_file(path), path, steps)
+    if issues:
+        raise ValueError("\n".join(str(issue) for issue in issues))
+    return run_feature_plan(ctx, steps, plan, out)
+
+
+class StepTimeoutError(Exception):
+    """Крок не вклався в бюджет часу (Config.step_timeout / scenario_timeout)."""
+
+
+class StepOutcome:
+    def __init__(
+        self,
+        step: BoundStep,
+        error: Optional[Exception],
+        duration: float,
+        commands: int,
+        command_time: float,
+        skipped: bool = False,
+        artifact: Optional[str] = None,
+    ):
+        self.step = step
         self.error = error
+        self.duration = duration
+        self.commands = commands
+        self.command_time = command_time
+        self.skipped = skipped
+        self.artifact = artifact
 
+    def to_result(self) -> StepResult:
+        return StepResult(
+            self.step.text,
+            self.error is None and not self.skipped,
+            None if self.error is None else str(self.error),
+            line_no=self.step.line_no,
+            duration=self.duration,
+            commands=self.commands,
+            command_time=self.command_time,
+            skipped=self.skipped,
+            artifact=self.artifact,
+        )
 
-class ScenarioResult:
-    def __init__(self, name: str):
-        self.name = name
-        self.steps: List[StepResult] = []
-
-    @property
-    def passed(self) -> bool:
-        # сценарій вважаємо успішним, якщо всі кроки пройшли
-        if not self.steps:
-            return True
-        return all(step.passed for step in self.steps)
-
-
-def parse_feature_file(path: Path) -> Dict[str, Any]:
-    """
-    - "Feature: ..."  -> назва фічі
-    - "Scenario: ..." -> назва сценарію
-    - Given/When/Then/And/But ... -> кроки
-    """
-    feature_name = None
-    scenarios: List[Dict[str, Any]] = []
-    current_scenario: Optional[Dict[str, Any]] = None
-
-    with path.open(encoding="utf-8") as f:
-        for raw_line in f:
-            line = raw_line.strip()
-            if not line or line.startswith("#"):
-                continue
-
-            if line.startswith("Feature:"):
-                feature_name = line[len("Feature:"):].strip()
-            elif line.startswith("Scenario:"):
-                # зберігаємо попередній сценарій
-                if current_scenario is not None:
-                    scenarios.append(current_scenario)
-                current_scenario = {
-                    "name": line[len("Scenario:"):].strip(),
-                    "steps": [],
-                }
-            elif line.startswith(("Given ", "When ", "Then ", "And ", "But ")):
-                if current_scenario is None:
-                    # крок без Scenario — ігноруємо
-                    continue
-                parts = line.split(" ", 1)
-                step_text = parts[1].strip() if len(parts) == 2 else ""
-                if step_text:
-                    current_scenario["steps"].append(step_text)
-
-    if current_scenario is not None:
-        scenarios.append(current_scenario)
 
-    return {
-        "feature_name": feature_name or path.name,
-        "scenarios": scenarios,
-    }
+def call_with_timeout(func: Callable[[], Any], timeout: Optional[float]) -> Tuple[bool, Any]:
+    """
+    Викликає func() в окремому потоці і чекає не довше timeout секунд.
+    Повертає (встиг, результат). Завислий потік не зупинити — він
+    лишається daemon-потоком, а драйвер, на якому він висить, викидається.
+    """
+    if timeout is None:
+        return True, func()
 
+    box: Dict[str, Any] = {}
 
-def run_feature_file(ctx, steps: StepsRegistry, path: Path) -> Dict[str, Any]:
-    parsed = parse_feature_file(path)
-    feature_name = parsed["feature_name"]
-    scenarios_data = parsed["scenarios"]
+    def target():
+        try:
+            box["result"] = func()
+        except BaseException as e:
+            box["error"] = e
 
-    print(f"\n=== Feature file: {path} ===")
-    print(f"Feature: {feature_name}")
+    thread = threading.Thread(target=target, name="kwiga-step", daemon=True)
+    thread.start()
+    thread.join(max(timeout, 0))
+    if thread.is_alive():
+        return False, None
+    if "error" in box:
+        raise box["error"]
+    return True, box["result"]
 
-    scenario_results: List[ScenarioResult] = []
 
-    for scenario_def in scenarios_data:
-        scenario = ScenarioResult(scenario_def["name"])
-        print(f"  Scenario: {scenario.name}")
-        for step_text in scenario_def["steps"]:
-            try:
-                steps.execute_step(step_text)
-                print(f"    {GREEN}[PASS]{RESET} {step_text}")
-                scenario.steps.append(StepResult(step_text, True))
-            except Exception as e:
-                print(f"    {RED}[FAIL]{RESET} {step_text} :: {e}")
-                scenario.steps.append(StepResult(step_text, False, str(e)))
-        scenario_results.append(scenario)
-
-    # локальна статистика по фічі
-    feature_steps_total = sum(len(s.steps) for s in scenario_results)
-    feature_steps_passed = sum(
-        sum(1 for st in s.steps if st.passed) for s in scenario_results
-    )
-    feature_steps_failed = feature_steps_total - feature_steps_passed
-
-    feature_scenarios_total = len(scenario_results)
-    feature_scenarios_passed = sum(1 for s in scenario_results if s.passed)
-    feature_scenarios_failed = feature_scenarios_total - feature_scenarios_passed
-
-    print("\n  --- Feature summary ---")
+def iter_step_outcomes(
+    steps: StepsRegistry, scenario_steps: List[BoundStep], spent: float = 0.0
+) -> Iterator[StepOutcome]:
+    """
+    Виконує кроки сценарію по черзі і віддає StepOutcome для кожного кроку
+    (помилка, час, кількість і час WebDriver-команд).
+    Два і більше read-only асерти поспіль (текст на сторінці, URL, мова)
+    перевіряються одним викликом до браузера, але результат — окремо по кроку;
+    час і команди пакета діляться між його кроками порівну.
+
+    Config.fail_fast — після першого впалого кроку решта пропускається.
+    Config.step_timeout / scenario_timeout — бюджети часу (секунди): крок,
+    що не вклався, падає з StepTimeoutError, а решта пропускається.
+    spent — скільки сценарій уже витратив до цих кроків (спільний префікс).
+    """
+    ctx = steps.ctx
+    config = ctx.config
+    scenario_deadline = (
+        None if config.scenario_timeout is None
+        else time.perf_counter() + config.scenario_timeout - spent
+    )
+    stopped = False
+    i = 0
+    while i < len(scenario_steps):
+        if stopped:
+            yield StepOutcome(scenario_steps[i], None, 0.0, 0, 0.0, skipped=True)
+            i += 1
+            continue
+
+        j = i
+        while j < len(scenario_steps) and steps.is_batchable(scenario_steps[j]):
+            j += 1
+        if j - i > 1:
+            group = scenario_steps[i:j]
+        else:
+            group = scenario_steps[i:i + 1]
+        n = len(group)
+
+        # бюджет групи: step_timeout, але не більше, ніж лишилось сценарію
+        budget, budget_name = config.step_timeout, "Step"
+        if scenario_deadline is not None:
+            remaining = scenario_deadline - time.perf_counter()
+            if budget is None or remaining < budget:
+                budget, budget_name = remaining, "Scenario"
+
+        def run_group():
+            if n > 1:
+                return steps.execute_batch(group)
+            return [steps.try_execute(group[0])]
+
+        commands_before, command_time_before = ctx.command_snapshot()
+        started = time.perf_counter()
+        if budget is not None and budget <= 0:
+            finished, errors = False, None
+        else:
+            finished, errors = call_with_timeout(run_group, budget)
+        duration = time.perf_counter() - started
+        commands_after, command_time_after = ctx.command_snapshot()
+
+        if not finished:
+            limit = config.step_timeout if budget_name == "Step" else config.scenario_timeout
+            errors = [StepTimeoutError(f"{budget_name} time budget of {limit:g}s exceeded")] * n
+
+        # знімок сторінки — до наступного кроку, поки стан ще той самий;
+        # після таймауту драйвер зайнятий завислою командою — не чіпаємо
+        artifact = None
+        failed = [(step, error) for step, error in zip(group, errors) if error is not None]
+        if finished and failed:
+            artifact = ctx.capture_failure(*failed[0])
+
+        # команди пакета порівну; остача — першому кроку, щоб сума зійшлась
+        commands, extra_commands = divmod(commands_after - commands_before, n)
+        for k, (step, error) in enumerate(zip(group, errors)):
+            yield StepOutcome(
+                step,
+                None if stopped else error,
+                duration / n,
+                commands + (extra_commands if k == 0 else 0),
+                (command_time_after - command_time_before) / n,
+                skipped=stopped,
+                artifact=None if error is None or stopped else artifact,
+            )
+            if error is not None and (config.fail_fast or not finished):
+                stopped = True
+        i += n
+
+
+def print_step(result: StepResult, out: Optional[TextIO] = None):
+    if result.skipped:
+        print(f"    {YELLOW}[SKIP]{RESET} {result.text}", file=out)
+    elif result.passed:
+        print(f"    {GREEN}[PASS]{RESET} {result.text}", file=out)
+    else:
+        print(f"    {RED}[FAIL]{RESET} {result.text} :: {result.error}", file=out)
+        if result.artifact:
+            print(f"           artifacts: {result.artifact}.*", file=out)
+
+
+def _breaks_driver(outcome: StepOutcome) -> bool:
+    # помилка не-асерту (впав драйвер, елемент не знайдено тощо) —
+    # сесію браузера краще не перевикористовувати
+    return outcome.error is not None and not isinstance(outcome.error, AssertionError)
+
+
+def run_scenario_plan(
+    ctx, steps: StepsRegistry, scenario_plan: ScenarioPlan, out: Optional[TextIO] = None
+) -> ScenarioResult:
+    scenario = ScenarioResult(scenario_plan.name)
+    backend_note = (
+        "" if scenario_plan.backend == BROWSER_BACKEND else f" [{scenario_plan.backend}]"
+    )
+    print(f"  Scenario: {scenario.name}{backend_note}", file=out)
+    ctx.scenario_name = scenario.name
+    ctx.use_backend(scenario_plan.backend)
+    ctx.begin_scenario()
+    broken = False
+    scenario_started = time.perf_counter()
+    try:
+        for outcome in iter_step_outcomes(steps, scenario_plan.steps):
+            result = outcome.to_result()
+            print_step(result, out)
+            broken = broken or _breaks_driver(outcome)
+            scenario.steps.append(result)
+    finally:
+        ctx.end_scenario(failed=broken)
+        scenario.duration = time.perf_counter() - scenario_started
+    return scenario
+
+
+class _PrefixTreeRun:
+    """
+    --share-prefixes: група сценаріїв зі спільним початком на одному драйвері.
+    Спільні кроки виконуються один раз; у точці розгалуження зберігається
+    стан (config, URL, cookies, storage) і відновлюється перед кожною
+    наступною гілкою, якщо попередня його змінила. Якщо спільний крок впав
+    або стан не зберегти, сценарії піддерева виконуються звичайним способом,
+    кожен з нуля.
+    """
+
+    def __init__(self, ctx, steps: StepsRegistry, scenarios: List[ScenarioPlan], out):
+        self.ctx = ctx
+        self.steps = steps
+        self.scenarios = scenarios
+        self.out = out
+        self.broken = False
+        # з останнього знімка/відновлення виконувались не лише read-only
+        # перевірки (або крок упав не на асерті) — стан треба відновити
+        self.dirty = False
+
+    def _track(self, outcome: StepOutcome):
+        broken = _breaks_driver(outcome)
+        self.broken = self.broken or broken
+        if broken or not (outcome.skipped or self.steps.is_batchable(outcome.step)):
+            self.dirty = True
+
+    def run(self, node: PrefixNode) -> Iterator[Tuple[int, ScenarioResult]]:
+        """Віддає (індекс сценарію, результат) у порядку виконання."""
+        self.ctx.use_backend(BROWSER_BACKEND)
+        self.ctx.begin_scenario()
+        try:
+            yield from self._run_node(node, [], 0.0, 0.0)
+        finally:
+            self.ctx.end_scenario(failed=self.broken)
+
+    def _run_node(
+        self, node: PrefixNode, prefix: List[StepResult], spent: float, restore_time: float
+    ) -> Iterator[Tuple[int, ScenarioResult]]:
+        """restore_time — відновлення стану перед цією гілкою (рахується її першому сценарію)."""
+        started = time.perf_counter()
+        shared: List[StepResult] = []
+        self.ctx.scenario_name = self.scenarios[node.scenarios[0]].name
+        for outcome in iter_step_outcomes(self.steps, node.steps, spent):
+            self._track(outcome)
+            shared.append(outcome.to_result())
+        spent += time.perf_counter() - started
+        if any(not result.passed for result in shared):
+            yield from self._run_separately(node.scenarios)
+            return
+        prefix = prefix + shared
+        # спільні кроки вузла змінили стан відносно знімка батьківського вузла
+        changed = self.dirty
+
+        branches: List[Tuple[Optional[int], Optional[PrefixNode]]] = [
+            (i, None) for i in node.ends
+        ] + [(None, child) for child in node.children]
+        state = self.ctx.save_state() if len(branches) > 1 else None
+        if len(branches) > 1 and state is None:
+            yield from self._run_separately(node.scenarios)
+            return
+
+        self.dirty = False
+        for k, (index, child) in enumerate(branches):
+            if k > 0:
+                restore_started = time.perf_counter()
+                try:
+                    if self.broken:
+                        self.ctx.quit_driver()
+                        self.broken = False
+                        self.dirty = True
+                    # попередня гілка лише перевіряла сторінку — вона та сама
+                    if self.dirty:
+                        self.ctx.restore_state(state)
+                        self.dirty = False
+                except Exception:
+                    self.broken = True
+                    rest = [i for i, _ in branches[k:] if i is not None]
+                    for _, other in branches[k:]:
+                        if other is not None:
+                            rest.extend(other.scenarios)
+                    yield from self._run_separately(sorted(rest))
+                    return
+                restore_time = time.perf_counter() - restore_started
+            if child is not None:
+                yield from self._run_node(child, prefix, spent, restore_time)
+            else:
+                yield index, self._finish(index, node.depth, prefix, spent, restore_time)
+        self.dirty = self.dirty or changed
+
+    def _finish(
+        self,
+        index: int,
+        depth: int,
+        prefix: List[StepResult],
+        spent: float,
+        restore_time: float,
+    ) -> ScenarioResult:
+        scenario_plan = self.scenarios[index]
+        scenario = ScenarioResult(scenario_plan.name)
+        for own, result in zip(scenario_plan.steps, prefix):
+            scenario.steps.append(
+                StepResult(
+                    own.text,
+                    result.passed,
+                    result.error,
+                    line_no=own.line_no,
+                    duration=result.duration,
+                    commands=result.commands,
+                    command_time=result.command_time,
+                    skipped=result.skipped,
+                )
+            )
+            # витрати спільного кроку записуються лише першому сценарію
+            result.duration = result.command_time = 0.0
+            result.commands = 0
+        self.ctx.scenario_name = scenario.name
+        tail_started = time.perf_counter()
+        for outcome in iter_step_outcomes(self.steps, scenario_plan.steps[depth:], spent):
+            self._track(outcome)
+            scenario.steps.append(outcome.to_result())
+        scenario.duration = (
+            restore_time
+            + sum(st.duration for st in scenario.steps[:depth])
+            + time.perf_counter()
+            - tail_started
+        )
+
+        print(f"  Scenario: {scenario.name} [shared prefix: {depth} step(s)]", file=self.out)
+        for result in scenario.steps:
+            print_step(result, self.out)
+        return scenario
+
+    def _run_separately(self, indices: List[int]) -> Iterator[Tuple[int, ScenarioResult]]:
+        self.ctx.end_scenario(failed=self.broken)
+        self.broken = False
+        self.dirty = True
+        for index in indices:
+            yield index, run_scenario_plan(self.ctx, self.steps, self.scenarios[index], self.out)
+
+
+def run_feature_plan(
+    ctx, steps: StepsRegistry, plan: FeaturePlan, out: Optional[TextIO] = None
+) -> Dict[str, Any]:
+    """
+    Виконує скомпільовану фічу.
+    out — куди писати лог (None -> stdout); паралельні воркери передають
+    буфер, щоб вивід фічі друкувався цілим блоком.
+    """
+    feature_name = plan.name
+    feature_started = time.perf_counter()
+
+    print(f"\n=== Feature file: {plan.path} ===", file=out)
+    print(f"Feature: {feature_name}", file=out)
+    ctx.feature_path = plan.path
+    ctx.out = out
+
+    slots: List[Optional[ScenarioResult]] = [None] * len(plan.scenarios)
+    counters = RunCounters()
+
+    units: List[Tuple[int, Optional[PrefixNode]]] = [
+        (i, None) for i in range(len(plan.scenarios))
+    ]
+    if ctx.config.share_prefixes:
+        units = prefix_groups(plan, steps.is_shareable)
+    elif ctx.config.share_outline_prefixes and any(
+        scenario.outline is not None for scenario in plan.scenarios
+    ):
+        units = prefix_groups(plan, steps.is_shareable, outlines_only=True)
+
+    for index, node in units:
+        if node is None:
+            finished = [(index, run_scenario_plan(ctx, steps, plan.scenarios[index], out))]
+        else:
+            finished = _PrefixTreeRun(ctx, steps, plan.scenarios, out).run(node)
+        for i, scenario in finished:
+            slots[i] = scenario
+            counters.add_scenario(scenario)
+    scenario_results = [scenario for scenario in slots if scenario is not None]
+
+    print("\n  --- Feature summary ---", file=out)
     print(
         "  Scenarios: {} (passed: {}{}{}," " failed: {}{}{})".format(
-            feature_scenarios_total,
+            counters.scenarios,
             GREEN,
-            feature_scenarios_passed,
+            counters.scenarios_passed,
             RESET,
             RED,
-            feature_scenarios_failed,
+            counters.scenarios_failed,
             RESET,
-        )
+        ),
+        file=out,
     )
     print(
-        "  Steps:     {} (passed: {}{}{}," " failed: {}{}{})".format(
-            feature_steps_total,
+        "  Steps:     {} (passed: {}{}{}," " failed: {}{}{}," " skipped: {}{}{})".format(
+            counters.steps,
             GREEN,
-            feature_steps_passed,
+            counters.steps_passed,
             RESET,
             RED,
-            feature_steps_failed,
+            counters.steps_failed,
             RESET,
-        )
+            YELLOW,
+            counters.steps_skipped,
+            RESET,
+        ),
+        file=out,
     )
 
     return {
         "scenario_results": scenario_results,
         "feature_name": feature_name,
+        "path": plan.path,
+        "duration": time.perf_counter() - feature_started,
     }
 
 
-def main():
-    # корінь проєкту: .../framework/core/runner.py -> два рівні вгору -> корінь
-    project_root = Path(__file__).resolve().parents[2]
-    features_dir = project_root / "tests" / "features"
+ResultCallback = Callable[[FeaturePlan, Dict[str, Any]], None]
 
-    if not features_dir.exists():
-        print(f"{RED}Features directory not found:{RESET} {features_dir}")
-        return
 
-    ctx = TestContext()
+def run_features_sequential(
+    plans: List[FeaturePlan],
+    make_context: Callable[[], Any],
+    on_result: Optional[ResultCallback] = None,
+) -> List[Dict[str, Any]]:
+    """
+    on_result(plan, feature_result) викликається одразу після кожної фічі;
+    тоді результати не накопичуються і повертається порожній список.
+    """
+    ctx = make_context()
     steps = StepsRegistry(ctx)
+    results: List[Dict[str, Any]] = []
+    try:
+        for plan in plans:
+            result = run_feature_plan(ctx, steps, plan)
+            if on_result is None:
+                results.append(result)
+            else:
+                on_result(plan, result)
+    finally:
+        ctx.quit_driver()
+    return results
+
+
+def run_features_parallel(
+    plans: List[FeaturePlan],
+    workers: int,
+    make_context: Callable[[], Any],
+    on_result: Optional[ResultCallback] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Розкидає фічі по пулу воркерів. Кожен потік-воркер має власні
+    TestContext і StepsRegistry (створюються ліниво при першій фічі),
+    а драйвери беруться зі спільного пулу теплих сесій.
+    Selenium-виклики — це мережеве очікування, тож потоків достатньо:
+    GIL відпускається, а браузери працюють окремими процесами.
+    on_result — як у run_features_sequential; викликається з головного потоку.
+    """
+    local = threading.local()
+    contexts = []
+    contexts_lock = threading.Lock()
 
-    all_feature_results: List[Dict[str, Any]] = []
+    def worker_steps() -> StepsRegistry:
+        if not hasattr(local, "steps"):
+            ctx = make_context()
+            local.steps = StepsRegistry(ctx)
+            with contexts_lock:
+                contexts.append(ctx)
+        return local.steps
 
-    MAX_FEATURE_FILES = None  # кількість тестів на виконання
+    def run_one(plan: FeaturePlan):
+        # визначення кроків у всіх реєстрах однакові, тож плани, скомпільовані
+        # одним реєстром, виконуються будь-яким іншим
+        steps = worker_steps()
+        buffer = io.StringIO()
+        result = run_feature_plan(steps.ctx, steps, plan, out=buffer)
+        return buffer.getvalue(), result
 
-    feature_files = sorted(features_dir.glob("*.kwiga"))
+    results: List[Dict[str, Any]] = []
+    try:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="kwiga-worker"
+        ) as executor:
+            # map повертає результати в порядку фіч — лог читається так само,
+            # як при послідовному запуску
+            for plan, (output, result) in zip(plans, executor.map(run_one, plans)):
+                print(output, end="", flush=True)
+                if on_result is None:
+                    results.append(result)
+                else:
+                    on_result(plan, result)
+    finally:
+        for ctx in contexts:
+            try:
+                ctx.quit_driver()
+            except Exception:
+                pass
 
-    if MAX_FEATURE_FILES is not None:
-        feature_files = feature_files[:MAX_FEATURE_FILES]
+    return results
 
-    if not feature_files:
-        print(f"{YELLOW}No .kwiga feature files found in{RESET} {features_dir}")
-        return
 
-    for path in feature_files:
-        result = run_feature_file(ctx, steps, path)
-        all_feature_results.append(result)
+def retry_failed_scenarios(
+    plans: List[FeaturePlan],
+    feature_results: List[Dict[str, Any]],
+    retries: int,
+    run_plans: Callable[[List[FeaturePlan]], List[Dict[str, Any]]],
+):
+    """
+    Після основного проходу повторює лише сценарії, що впали, до retries разів.
+    run_plans виконує плани на тих самих (вже теплих) драйверах пулу.
+    Результат повторної спроби замінює попередній у feature_results.
+    """
+    for attempt in range(1, retries + 1):
+        retry_plans: List[FeaturePlan] = []
+        positions: List[Tuple[Dict[str, Any], List[int]]] = []
+        for plan, fr in zip(plans, feature_results):
+            failed = [i for i, sc in enumerate(fr["scenario_results"]) if not sc.passed]
+            if failed:
+                retry_plans.append(replace(plan, scenarios=[plan.scenarios[i] for i in failed]))
+                positions.append((fr, failed))
+        if not retry_plans:
+            return
+
+        failed_total = sum(len(failed) for _, failed in positions)
+        print(
+            f"\n{YELLOW}=========== RETRY {attempt}/{retries}: "
+            f"{failed_total} failed scenario(s) ==========={RESET}"
+        )
+        for (fr, failed), retry_fr in zip(positions, run_plans(retry_plans)):
+            for index, result in zip(failed, retry_fr["scenario_results"]):
+                result.attempts = fr["scenario_results"][index].attempts + 1
+                fr["scenario_results"][index] = result
 
-    # глобальна статистика
-    total_features = len(all_feature_results)
-    all_scenarios: List[ScenarioResult] = []
-    for fr in all_feature_results:
-        all_scenarios.extend(fr["scenario_results"])
 
-    total_scenarios = len(all_scenarios)
-    passed_scenarios = sum(1 for s in all_scenarios if s.passed)
-    failed_scenarios = total_scenarios - passed_scenarios
+def print_dry_run(plans: List[FeaturePlan], registry: StepsRegistry):
+    """--dry-run: що і в якому порядку було б виконано, без жодного драйвера."""
+    scenarios_total = steps_total = http_total = 0
+    for plan in plans:
+        print(f"\n=== Feature file: {plan.path} ===")
+        print(f"Feature: {plan.name}")
+        for scenario in plan.scenarios:
+            print(f"  Scenario: {scenario.name} [{scenario.backend}]")
+            for step in scenario.steps:
+                print(
+                    f"    {step.keyword} {step.text}  "
+                    f"-> {registry.definition_name(step)} (line {step.line_no})"
+                )
+            scenarios_total += 1
+            steps_total += len(scenario.steps)
+            http_total += scenario.backend == HTTP_BACKEND
 
-    total_steps = sum(len(s.steps) for s in all_scenarios)
-    passed_steps = sum(
-        sum(1 for st in s.steps if st.passed) for s in all_scenarios
+    print("\n=========== DRY RUN ===========")
+    print(
+        f"Features:   {len(plans)}\n"
+        f"Scenarios:  {scenarios_total} ({http_total} on the HTTP backend)\n"
+        f"Steps:      {steps_total} (all bound)"
     )
-    failed_steps = total_steps - passed_steps
+    print(f"{GREEN}Nothing was run.{RESET}")
 
+
+def print_overall_summary(counters: RunCounters):
     print("\n=========== OVERALL SUMMARY ===========")
-    print("Features:   {}".format(total_features))
+    print("Features:   {}".format(counters.features))
     print(
         "Scenarios:  {} (passed: {}{}{}," " failed: {}{}{})".format(
-            total_scenarios,
+            counters.scenarios,
             GREEN,
-            passed_scenarios,
+            counters.scenarios_passed,
             RESET,
             RED,
-            failed_scenarios,
+            counters.scenarios_failed,
             RESET,
         )
     )
     print(
-        "Steps:      {} (passed: {}{}{}," " failed: {}{}{})".format(
-            total_steps,
+        "Steps:      {} (passed: {}{}{}," " failed: {}{}{}," " skipped: {}{}{})".format(
+            counters.steps,
             GREEN,
-            passed_steps,
+            counters.steps_passed,
             RESET,
             RED,
-            failed_steps,
+            counters.steps_failed,
+            RESET,
+            YELLOW,
+            counters.steps_skipped,
             RESET,
         )
     )
 
-    if failed_scenarios > 0 or failed_steps > 0:
+    if counters.flaky:
+        print(
+            "Flaky:      {}{}{} scenario(s) passed only on retry: {}".format(
+                YELLOW,
+                len(counters.flaky),
+                RESET,
+                ", ".join(counters.flaky),
+            )
+        )
+
+    if counters.scenarios_failed > 0 or counters.steps_failed > 0:
         print(
             "\n{}Some scenarios/steps failed. "
             "Check the log above for details.{}".format(RED, RESET)
         )
 
 
+def profile_arg(value: str) -> str:
+    try:
+        resolve_profile(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m framework.core.runner",
+        description="Run Kwiga BDD feature files.",
+    )
+    parser.add_argument(
+        "--features-dir",
+        type=Path,
+        default=None,
+        help="directory with *.kwiga files (default: tests/features)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of parallel workers, each with its own browser "
+        "(0 = one per CPU core; default: 1)",
+    )
+    parser.add_argument(
+        "--pool-max-uses",
+        type=int,
+        default=None,
+        help="recycle a browser session after this many scenarios "
+        "(default: Config.pool_max_uses)",
+    )
+    parser.add_argument(
+        "--max-browser-rss-mb",
+        type=int,
+        default=None,
+        help="recycle a browser whose process tree uses more memory than this "
+        "after a scenario; 0 disables the limit (default: Config.max_browser_rss_mb)",
+    )
+    parser.add_argument(
+        "--driver-path",
+        default=None,
+        help="explicit path to chromedriver/geckodriver",
+    )
+    parser.add_argument(
+        "--offline-drivers",
+        action="store_true",
+        help="never download drivers: use the cache, --driver-path or PATH",
+    )
+    parser.add_argument(
+        "--no-parse-cache",
+        action="store_true",
+        help="always re-parse feature files instead of using .kwiga_cache/",
+    )
+    parser.add_argument(
+        "--reports-dir",
+        type=Path,
+        default=None,
+        help="where to write junit.xml and timings.json (default: reports/)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="how many of the slowest steps to list after the summary",
+    )
+    parser.add_argument(
+        "--dry-run",
+        "--list",
+        dest="dry_run",
+        action="store_true",
+        help="parse and bind every step, then list features, scenarios and steps "
+        "in run order without starting any browser",
+    )
+    parser.add_argument(
+        "--max-features",
+        type=int,
+        default=None,
+        help="run only the first N feature files (sorted by name)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="run only shard i of n, e.g. 2/3 (features are split by a stable "
+        "hash of their path, or balanced by --shard-timings)",
+    )
+    parser.add_argument(
+        "--shard-timings",
+        type=Path,
+        default=None,
+        help="timings file shared by all CI agents (e.g. committed to the repo); "
+        "with --shard the features are balanced by its durations",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="where to keep the parse cache, timing history and results "
+        "(default: .kwiga_cache/)",
+    )
+    parser.add_argument(
+        "--timings-db",
+        type=Path,
+        default=None,
+        help="feature duration history (default: .kwiga_cache/timings.json)",
+    )
+    snapshot_group = parser.add_mutually_exclusive_group()
+    snapshot_group.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="record site responses into DIR while running against the live site",
+    )
+    snapshot_group.add_argument(
+        "--replay",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="serve site responses from DIR, fully offline",
+    )
+    parser.add_argument(
+        "--snapshot-hosts",
+        default=",".join(DEFAULT_HOSTS),
+        help="comma-separated hosts (with subdomains) to record/replay "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=profile_arg,
+        default=None,
+        help="browser performance profile(s), comma-separated: "
+        + ", ".join(PERFORMANCE_PROFILES)
+        + " (features can override with 'performance profile \"...\"')",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="skip the remaining steps of a scenario after its first failed step",
+    )
+    parser.add_argument(
+        "--step-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="fail a step (and skip the rest of its scenario) if it runs longer",
+    )
+    parser.add_argument(
+        "--scenario-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="time budget for a whole scenario",
+    )
+    parser.add_argument(
+        "--isolate-contexts",
+        action="store_true",
+        help="run every scenario in a fresh incognito browser context "
+        "inside the same Chrome process instead of resetting the session",
+    )
+    parser.add_argument(
+        "--no-artifacts",
+        action="store_true",
+        help="do not save screenshots, page source and console logs of failed steps",
+    )
+    parser.add_argument(
+        "--artifacts-max-mb",
+        type=int,
+        default=None,
+        help="stop saving failure artifacts after this many megabytes "
+        "(default: Config.artifacts_max_mb)",
+    )
+    parser.add_argument(
+        "--share-prefixes",
+        action="store_true",
+        help="run identical leading steps of a feature's scenarios once, then "
+        "restore the saved browser state (URL, cookies, storage) for each branch",
+    )
+    parser.add_argument(
+        "--no-outline-sharing",
+        action="store_true",
+        help="run every Examples row of a Scenario Outline from scratch instead "
+        "of sharing the rows' identical leading steps",
+    )
+    parser.add_argument(
+        "--last-failed",
+        action="store_true",
+        help="run only the scenarios that failed in the previous run",
+    )
+    parser.add_argument(
+        "--changed",
+        action="store_true",
+        help="run only feature files changed since the previous run "
+        "(any change to step definitions or page objects selects everything)",
+    )
+    parser.add_argument(
+        "--failed-first",
+        action="store_true",
+        help="run features with previously failed scenarios first",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="re-run failed scenarios up to N times after the main pass, "
+        "on the same warm browsers; scenarios that pass on retry are "
+        "reported as flaky",
+    )
+    parser.add_argument(
+        "--no-http-backend",
+        action="store_true",
+        help="run every scenario in a real browser, even those whose steps "
+        "only need plain HTTP",
+    )
+    return parser.parse_args(argv)
+
+
+def build_config(args: argparse.Namespace) -> Config:
+    """Базовий Config запуску: значення за замовчуванням + опції CLI."""
+    config = Config()
+    if args.pool_max_uses is not None:
+        config.pool_max_uses = args.pool_max_uses
+    if args.max_browser_rss_mb is not None:
+        config.max_browser_rss_mb = args.max_browser_rss_mb
+    if args.driver_path:
+        config.driver_path = args.driver_path
+    if args.offline_drivers:
+        config.offline_drivers = True
+    if args.profile:
+        config.profile = args.profile
+    if args.no_http_backend:
+        config.http_backend = False
+    if args.isolate_contexts:
+        config.isolate_contexts = True
+    if args.no_artifacts:
+        config.failure_artifacts = False
+    if args.artifacts_max_mb is not None:
+        config.artifacts_max_mb = args.artifacts_max_mb
+    if args.share_prefixes:
+        config.share_prefixes = True
+    if args.no_outline_sharing:
+        config.share_outline_prefixes = False
+    if args.fail_fast:
+        config.fail_fast = True
+    if args.step_timeout is not None:
+        config.step_timeout = args.step_timeout
+    if args.scenario_timeout is not None:
+        config.scenario_timeout = args.scenario_timeout
+    return config
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+
+    # корінь проєкту: .../framework/core/runner.py -> два рівні вгору -> корінь
+    project_root = Path(__file__).resolve().parents[2]
+    features_dir = args.features_dir or project_root / "tests" / "features"
+
+    if not features_dir.exists():
+        print(f"{RED}Features directory not found:{RESET} {features_dir}")
+        return
+
+    feature_files = sorted(features_dir.glob("*.kwiga"))
+
+    if args.max_features is not None:
+        feature_files = feature_files[:args.max_features]
+
+    if not feature_files:
+        print(f"{YELLOW}No .kwiga feature files found in{RESET} {features_dir}")
+        return
+
+    config = build_config(args)
+    cache_dir = args.cache_dir or project_root / ".kwiga_cache"
+
+    # компіляція без браузера: всі невизначені кроки видно одразу
+    parse_cache = (
+        None if args.no_parse_cache
+        else ParseCache(cache_dir / "parse_cache.pickle")
+    )
+    registry = StepsRegistry(TestContext(config=replace(config)))
+    plans, issues = compile_feature_files(
+        feature_files,
+        registry,
+        parse_cache,
+        allow_http=config.http_backend,
+    )
+    if issues:
+        print(f"\n{RED}=========== UNDEFINED / AMBIGUOUS STEPS, INVALID OUTLINES ==========={RESET}")
+        for issue in issues:
+            print(f"{issue}")
+        print(f"\n{RED}{len(issues)} compile issue(s), nothing was run.{RESET}")
+        return 1
+
+    def plan_key(plan: FeaturePlan) -> str:
+        return plan.path.relative_to(features_dir).as_posix()
+
+    # вибір за результатами попереднього прогону — до запуску будь-якого драйвера
+    result_store = ResultStore(cache_dir / "results.json")
+    fingerprint = code_fingerprint(project_root)
+    content_hashes: Dict[Path, str] = {}
+
+    def plan_hash(plan: FeaturePlan) -> str:
+        if plan.path not in content_hashes:
+            content_hashes[plan.path] = file_hash(plan.path)
+        return content_hashes[plan.path]
+
+    compiled_scenarios = {plan_key(plan): len(plan.scenarios) for plan in plans}
+    if args.last_failed or args.changed:
+        plans = select_plans(
+            plans,
+            result_store,
+            plan_key,
+            plan_hash,
+            fingerprint,
+            last_failed=args.last_failed,
+            changed=args.changed,
+        )
+        print(
+            f"Selected {sum(len(plan.scenarios) for plan in plans)} scenarios "
+            f"in {len(plans)} feature files from the previous run's results"
+        )
+        if not plans:
+            print(f"{GREEN}Nothing to run: no failed or changed scenarios.{RESET}")
+            return 0
+
+    # розклад: найдовші фічі першими, опційно — лише свій шард
+    timing_db = TimingDB(args.timings_db or cache_dir / "timings.json")
+
+    def plan_estimate(plan: FeaturePlan) -> float:
+        return timing_db.estimate(plan_key(plan), plan_step_count(plan))
+
+    if args.shard:
+        shard_index, shard_total = args.shard
+        shared_estimate = None
+        if args.shard_timings:
+            # спільний для всіх агентів файл: однакові оцінки -> однакове розбиття
+            shard_db = TimingDB(args.shard_timings)
+
+            def shared_estimate(plan: FeaturePlan) -> float:
+                return shard_db.estimate(plan_key(plan), plan_step_count(plan))
+
+        plans = shard(plans, plan_key, shard_index, shard_total, shared_estimate)
+        print(f"Shard {shard_index}/{shard_total}: {len(plans)} feature files")
+        if not plans:
+            return
+    plans = longest_first(plans, plan_estimate, plan_key)
+
+    if args.failed_first:
+        # стабільне розбиття: порядок розкладу всередині груп зберігається
+        plans.sort(key=lambda plan: not result_store.failed_scenarios(plan_key(plan)))
+
+    if args.dry_run:
+        print_dry_run(plans, registry)
+        return 0
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    workers = min(workers, len(plans))
+
+    scenarios_total = sum(len(plan.scenarios) for plan in plans)
+    http_scenarios = sum(
+        1 for plan in plans for sc in plan.scenarios if sc.backend == HTTP_BACKEND
+    )
+    if http_scenarios:
+        print(
+            f"HTTP backend: {http_scenarios} of {scenarios_total} scenarios "
+            "run without a browser"
+        )
+    # браузер потрібен лише фічам, де є хоча б один не-HTTP сценарій
+    browser_plans = sum(
+        1 for plan in plans if any(sc.backend != HTTP_BACKEND for sc in plan.scenarios)
+    )
+
+    snapshot = None
+    if args.record or args.replay:
+        snapshot = SnapshotServer(
+            args.record or args.replay,
+            mode="record" if args.record else "replay",
+            hosts=args.snapshot_hosts.split(","),
+        ).start()
+        config.base_url = snapshot.rewrite_url(config.base_url)
+        if args.replay:
+            # офлайн: усе, що не з локального сервера, одразу "не знайдено"
+            # (прапорець лише для Chrome)
+            config.chrome_args += (
+                "--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE localhost, "
+                "EXCLUDE *.localhost",
+            )
+        print(f"Snapshot {snapshot.mode} server on 127.0.0.1:{snapshot.port}")
+
+    # звіти пишуться по мірі завершення фіч: пам'ять не росте з розміром набору
+    reports_dir = args.reports_dir or project_root / "reports"
+    counters = RunCounters()
+    slowest_steps = SlowestStepsSink(args.top)
+    sinks = [
+        JUnitSink(reports_dir / "junit.xml"),
+        TimingProfileSink(reports_dir / "timings.json"),
+        JsonlSink(reports_dir / "results.jsonl"),
+    ]
+    # фічі з впалими сценаріями чекають на --retries, решта йде в sinks одразу
+    pending: List[Tuple[FeaturePlan, Dict[str, Any]]] = []
+
+    def finish_feature(plan: FeaturePlan, fr: Dict[str, Any]):
+        # частковий прогін фічі (--last-failed) не показовий для розкладу
+        if len(plan.scenarios) == compiled_scenarios[plan_key(plan)]:
+            timing_db.record(plan_key(plan), fr["duration"], plan_step_count(plan))
+        scenario_outcomes: Dict[str, bool] = {}
+        for scenario in fr["scenario_results"]:
+            scenario_outcomes[scenario.name] = (
+                scenario_outcomes.get(scenario.name, True) and scenario.passed
+            )
+            result_store.record_attempts(
+                plan_key(plan), scenario.name, scenario.passed, scenario.attempts
+            )
+        result_store.record(plan_key(plan), plan_hash(plan), fingerprint, scenario_outcomes)
+        counters.add_feature(fr)
+        slowest_steps.feature_finished(fr)
+        for sink in sinks:
+            sink.feature_finished(fr)
+
+    def on_result(plan: FeaturePlan, fr: Dict[str, Any]):
+        if args.retries > 0 and any(not sc.passed for sc in fr["scenario_results"]):
+            pending.append((plan, fr))
+        else:
+            finish_feature(plan, fr)
+
+    artifacts = None
+    if config.failure_artifacts:
+        artifacts = ArtifactWriter(
+            reports_dir / "artifacts", max_bytes=config.artifacts_max_mb * 1024 * 1024
+        )
+
+    page_metrics_log.clear()
+    run_started = time.perf_counter()
+    memory = MemoryStats(config.max_browser_rss_mb)
+    if config.max_browser_rss_mb and browser_plans and not rss_available():
+        print(
+            f"{YELLOW}Browser RSS cannot be measured here (install psutil): "
+            f"--max-browser-rss-mb {config.max_browser_rss_mb} is not enforced{RESET}"
+        )
+    pool = DriverPool(max_uses=config.pool_max_uses, memory=memory)
+
+    def make_context():
+        return TestContext(
+            config=replace(config),
+            pool=pool,
+            snapshot=snapshot,
+            artifacts=artifacts,
+            memory=memory,
+        )
+
+    try:
+        if workers > 1:
+            print(f"Running {len(plans)} feature files on {workers} workers")
+            # запускаємо браузери для всіх воркерів одночасно, а не по черзі
+            pool.warm(
+                config.browser,
+                config.headless,
+                count=min(workers, browser_plans),
+                **config.driver_options(),
+            )
+            run_features_parallel(plans, workers, make_context, on_result)
+        else:
+            run_features_sequential(plans, make_context, on_result)
+
+        if pending:
+            def run_plans(retry_plans: List[FeaturePlan]) -> List[Dict[str, Any]]:
+                if workers > 1:
+                    return run_features_parallel(
+                        retry_plans, min(workers, len(retry_plans)), make_context
+                    )
+                return run_features_sequential(retry_plans, make_context)
+
+            retry_failed_scenarios(
+                [plan for plan, _ in pending],
+                [fr for _, fr in pending],
+                args.retries,
+                run_plans,
+            )
+    finally:
+        pool.shutdown()
+        if snapshot is not None:
+            snapshot.stop()
+
+    for plan, fr in pending:
+        finish_feature(plan, fr)
+    pending.clear()
+
+    wall_time = time.perf_counter() - run_started
+    if artifacts is not None:
+        # дописуємо те, що ще в черзі; wall_time цього не включає
+        artifacts.close()
+    timing_db.save()
+    result_store.save()
+
+    # глобальна статистика
+    print_overall_summary(counters)
+    print(f"Time:       {wall_time:.1f}s")
+    print(pool.report())
+    if memory.samples or memory.leaked_tabs or (memory.max_rss_mb and memory.unmeasured):
+        print(memory.report())
+    page_loads = pool.page_load_report()
+    if page_loads:
+        print(page_loads)
+    if snapshot is not None:
+        print(snapshot.report())
+    if page_metrics_log.samples:
+        print(page_metrics_log.report())
+        # часовий ряд між збірками: прогін дописується в кінець файлу
+        page_metrics_log.write(
+            reports_dir / "page_metrics.json",
+            profile=config.profile,
+            features=counters.features,
+        )
+    if artifacts is not None and (artifacts.captured or artifacts.dropped):
+        print(artifacts.report())
+    slowest_steps.close(wall_time)
+
+    extra = {
+        "profile": config.profile,
+        "http_scenarios": http_scenarios,
+        "retries": args.retries,
+        # історична нестабільність сценаріїв (кандидати на карантин)
+        "flakiness": result_store.flakiness_report(),
+        "page_loads": {
+            profile: {"count": int(count), "seconds": round(seconds, 3)}
+            for profile, (count, seconds) in pool.page_loads.items()
+        },
+        "memory": memory.as_dict(),
+    }
+    for sink in sinks:
+        sink.close(wall_time, extra)
+    print(f"\nReports written to {reports_dir}")
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# оцінка для кроку, якщо історії ще немає зовсім (секунди)
+DEFAULT_STEP_SECONDS = 2.0
+
+
+class TimingDB:
+    """
+    Локальна база історичних тривалостей фіч (JSON).
+    Тривалість зберігається як експоненційне середнє, щоб один повільний
+    прогін не ламав розклад.
+    """
+
+    def __init__(self, path: Path, alpha: float = 0.5):
+        self.path = Path(path)
+        self.alpha = alpha
+        self.features: Dict[str, Dict[str, float]] = {}
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                self.features = json.load(f).get("features", {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def seconds_per_step(self) -> float:
+        total_duration = sum(f["duration"] for f in self.features.values())
+        total_steps = sum(f["steps"] for f in self.features.values())
+        if total_steps <= 0:
+            return DEFAULT_STEP_SECONDS
+        return total_duration / total_steps
+
+    def estimate(self, key: str, step_count: int) -> float:
+        """Очікувана тривалість фічі; без історії — за кількістю кроків."""
+        entry = self.features.get(key)
+        if entry is not None:
+            return entry["duration"]
+        return step_count * self.seconds_per_step()
+
+    def record(self, key: str, duration: float, step_count: int):
+        entry = self.features.get(key)
+        if entry is None:
+            self.features[key] = {"duration": duration, "steps": step_count, "runs": 1}
+            return
+        entry["duration"] = self.alpha * duration + (1 - self.alpha) * entry["duration"]
+        entry["steps"] = step_count
+        entry["runs"] = entry.get("runs", 0) + 1
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": 1, "features": self.features}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """'2/3' -> (2, 3); номер шарда починається з 1."""
+    index, sep, total = value.partition("/")
+    if not sep:
+        raise ValueError(f"Shard must look like i/n, got: {value}")
+    index, total = int(index), int(total)
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Shard index must be in 1..{total}, got: {value}")
+    return index, total
+
+
+def longest_first(items: Sequence[T], estimate: Callable[[T], float],
+                  key: Callable[[T], str]) -> List[T]:
+    """LPT-порядок: найдовші фічі першими (рівні — за назвою, детерміновано)."""
+    return sorted(items, key=lambda item: (-estimate(item), key(item)))
+
+
+def _stable_bucket(key: str, total: int) -> int:
+    # hash() у Python солиться на кожен процес — потрібен однаковий на всіх агентах
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % total
+
+
+def shard(items: Sequence[T], key: Callable[[T], str], index: int, total: int,
+          shared_estimate: Optional[Callable[[T], float]] = None) -> List[T]:
+    """
+    Фічі шарда index (1..total). Належність до шарда залежить лише від
+    того, що однакове на всіх агентах:
+    - shared_estimate (оцінки зі спільного, напр. закоміченого файлу тривалостей) —
+      жадібний LPT: кожна наступна найдовша фіча йде в найменш завантажений шард;
+    - інакше — стабільний хеш шляху фічі.
+    Локальна історія на розбиття не впливає — лише на порядок усередині шарда.
+    """
+    if shared_estimate is None:
+        return [item for item in items if _stable_bucket(key(item), total) == index - 1]
+
+    loads = [0.0] * total
+    buckets: List[List[T]] = [[] for _ in range(total)]
+    for item in longest_first(items, shared_estimate, key):
+        target = min(range(total), key=lambda b: (loads[b], b))
+        buckets[target].append(item)
+        loads[target] += shared_estimate(item)
+    return buckets[index - 1]
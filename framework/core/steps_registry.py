@@ -1,47 +1,197 @@
 import re
-from typing import Callable, List, Tuple
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from framework.core.assertions import assert_contains, assert_true
+from framework.web.driver_factory import resolve_profile
+from framework.web.page_metrics import capture_page_metrics
+from framework.web.waits import check_page, find_text, wait_for_text
+
+# Page objects і selenium імпортуються всередині кроків: вони потрібні лише
+# коли є драйвер, а компіляція/--dry-run не повинні платити за імпорт selenium.
+
+
+# одиниці для кроку "I expect transferred bytes under <N> <unit>"
+_BYTE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 * 1024}
+
+# символи, з яких починається "нелітеральна" частина регулярки
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Літеральний початок шаблону кроку, напр. 'I click footer link "'
+    для r'^I click footer link "(.+)"$'. Використовується як ключ індексу.
+    """
+    source = pattern[1:] if pattern.startswith("^") else pattern
+    prefix: List[str] = []
+    i = 0
+    while i < len(source):
+        ch = source[i]
+        if ch == "\\" and i + 1 < len(source) and not source[i + 1].isalnum():
+            literal, width = source[i + 1], 2
+        elif ch in _REGEX_META:
+            break
+        else:
+            literal, width = ch, 1
+
+        following = source[i + width : i + width + 1]
+        if following in ("*", "?", "{"):
+            # символ може бути необов'язковим — далі префікс не гарантований
+            break
+        prefix.append(literal)
+        if following == "+":
+            break
+        i += width
+    return "".join(prefix)
+
+
+class UndefinedStepError(ValueError):
+    pass
+
+
+class AmbiguousStepError(ValueError):
+    pass
+
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+@dataclass
+class PageCheck:
+    """
+    Опис read-only перевірки сторінки, яку можна виконати в пакеті з іншими
+    (див. waits.check_page). message(actual) будує текст помилки вже після
+    перевірки: текст кроку може містити будь-які символи, зокрема "{...}".
+    """
+    kind: str
+    value: str
+    wait: bool
+    message: Callable[[str], str]
 
-from framework.core.assertions import assert_contains
-from framework.pages.home_page import HomePage
-from framework.pages.catalog_page import CatalogPage
+
+@dataclass
+class StepDefinition:
+    pattern: re.Pattern
+    func: Callable
+    prefix: str
+    # для read-only асертів: match -> PageCheck
+    check: Optional[Callable] = None
+    # крок працює на HttpDriver (без JS і рендерингу), див. web/http_backend.py
+    http: bool = False
+    # наслідки кроку — лише config, URL, cookies і storage: його можна виконати
+    # один раз для кількох сценаріїв зі спільним початком (--share-prefixes)
+    shared: bool = False
+
+
+def _language_snippet(lang: str) -> str:
+    if lang in ("uk", "ua", "ukrainian", "українська"):
+        return "Усі інструменти для успішного бізнесу"
+    return "All tools for a successful business"
 
 
 class StepsRegistry:
     def __init__(self, ctx):
         self.ctx = ctx
-        self._steps: List[Tuple[re.Pattern, Callable]] = []
+        self._steps: List[StepDefinition] = []
+        # індекс: префіксне дерево літеральних префіксів шаблонів;
+        # у вузлі під ключем None — номери визначень, чий префікс тут закінчується
+        self._prefix_trie: Dict = {}
         self._register_default_steps()
 
-    def _register(self, pattern: str, func: Callable):
-        self._steps.append((re.compile(pattern), func))
+    def _register(
+        self,
+        pattern: str,
+        func: Callable,
+        check: Optional[Callable] = None,
+        http: bool = False,
+        shared: bool = False,
+    ):
+        prefix = literal_prefix(pattern)
+        self._steps.append(
+            StepDefinition(re.compile(pattern), func, prefix, check, http, shared)
+        )
+        node = self._prefix_trie
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(len(self._steps) - 1)
 
     def _register_default_steps(self):
         # Базові кроки налаштування
-        self._register(r'^app baseUrl "(.+)"$', self.step_set_base_url)
-        self._register(r'^browser "(\w+)" headless (true|false)$', self.step_set_browser)
+        self._register(
+            r'^app baseUrl "(.+)"$', self.step_set_base_url, http=True, shared=True
+        )
+        self._register(
+            r'^browser "(\w+)" headless (true|false)$',
+            self.step_set_browser,
+            http=True,
+            shared=True,
+        )
+        self._register(
+            r'^performance profile "(.+)"$', self.step_set_profile, http=True, shared=True
+        )
 
         # Навігація на головну
-        self._register(r'^I open "home"$', self.step_open_home)
+        self._register(r'^I open "home"$', self.step_open_home, http=True, shared=True)
 
         # Пошук курсу (unlock.kwiga.com)
         self._register(r'^I search course "(.+)"$', self.step_search_course)
-        self._register(r'^I expect results contain title "(.+)"$', self.step_expect_result_title)
+        self._register(
+            r'^I expect results contain title "(.+)"$',
+            self.step_expect_result_title,
+            shared=True,
+        )
 
         # Перемикання мови (kwiga.com ↔ kwiga.com/ua)
-        self._register(r'^I switch language to "(.+)"$', self.step_switch_language)
-        self._register(r'^I expect page language is "(.+)"$', self.step_expect_page_language)
+        self._register(
+            r'^I switch language to "(.+)"$', self.step_switch_language, shared=True
+        )
+        self._register(
+            r'^I expect page language is "(.+)"$',
+            self.step_expect_page_language,
+            check=self.check_page_language,
+            http=True,
+        )
 
         # Додаткові кроки для головного сайту kwiga.com
-        self._register(r'^I click header menu "(.+)"$', self.step_click_header_menu)
-        self._register(r'^I click footer link "(.+)"$', self.step_click_footer_link)
+        # лінк може відкрити нову вкладку — тоді знімок стану не робиться
+        # і сценарії виконуються окремо (див. capture_browser_state)
+        self._register(
+            r'^I click header menu "(.+)"$',
+            self.step_click_header_menu,
+            http=True,
+            shared=True,
+        )
+        self._register(
+            r'^I click footer link "(.+)"$',
+            self.step_click_footer_link,
+            http=True,
+            shared=True,
+        )
         self._register(r'^I click button "(.+)"$', self.step_click_button)
         self._register(r'^I click css "(.+)"$', self.step_click_css)
         self._register(r'^I click header dropdown "(.+)"$', self.step_click_header_dropdown)
-        self._register(r'^I expect page contains text "(.+)"$', self.step_expect_page_contains_text)
-        self._register(r'^I expect current url contains "(.+)"$', self.step_expect_current_url_contains)
+        self._register(
+            r'^I expect page contains text "(.+)"$',
+            self.step_expect_page_contains_text,
+            check=self.check_page_contains_text,
+            http=True,
+        )
+        self._register(
+            r'^I expect current url contains "(.+)"$',
+            self.step_expect_current_url_contains,
+            check=self.check_current_url_contains,
+            http=True,
+        )
+
+        # Швидкодія сторінки (Navigation Timing / Resource Timing)
+        self._register(
+            r'^I expect page load under (\d+) ms$',
+            self.step_expect_page_load_under,
+            shared=True,
+        )
+        self._register(
+            r'^I expect transferred bytes under (\d+(?:\.\d+)?) (B|KB|MB)$',
+            self.step_expect_transferred_bytes_under,
+            shared=True,
+        )
 
         # Крок для роботи з новою вкладкою (Book a demo)
         self._register(r'^I switch to new tab$', self.step_switch_to_new_tab)
@@ -52,7 +202,7 @@ class StepsRegistry:
 
     def step_set_base_url(self, m):
         """Given app baseUrl "<url>"."""
-        self.ctx.config.base_url = m.group(1)
+        self.ctx.config.base_url = self.ctx.site_url(m.group(1))
 
     def step_set_browser(self, m):
         """And browser "<name>" headless <true|false>."""
@@ -61,9 +211,24 @@ class StepsRegistry:
         self.ctx.config.browser = browser
         self.ctx.config.headless = headless
 
+    def step_set_profile(self, m):
+        """
+        And performance profile "<name>[,<name>...]".
+        Має йти до першого кроку, що відкриває браузер.
+        """
+        profile = m.group(1)
+        resolve_profile(profile)  # перевіряємо назву одразу
+        if self.ctx.driver is not None and profile != self.ctx.config.profile:
+            raise ValueError(
+                "Performance profile must be set before the browser is started"
+            )
+        self.ctx.config.profile = profile
+
     def step_open_home(self, m):
         """When I open "home"."""
         self.ctx.init_driver()
+        from framework.pages.home_page import HomePage
+
         hp = HomePage(self.ctx.driver, self.ctx.config.base_url)
         hp.open_home()
 
@@ -75,6 +240,8 @@ class StepsRegistry:
         """And I search course "<query>"."""
         query = m.group(1)
         self.ctx.init_driver()
+        from framework.pages.home_page import HomePage
+
         hp = HomePage(self.ctx.driver, self.ctx.config.base_url)
         hp.search_course(query)
 
@@ -82,6 +249,8 @@ class StepsRegistry:
         """Then I expect results contain title "<title>"."""
         expected = m.group(1)
         self.ctx.init_driver()
+        from framework.pages.catalog_page import CatalogPage
+
         cp = CatalogPage(self.ctx.driver, self.ctx.config.base_url)
         titles = cp.get_course_titles()
         assert_contains(
@@ -98,6 +267,8 @@ class StepsRegistry:
         """And I switch language to "<lang>"."""
         lang = m.group(1).lower()
         self.ctx.init_driver()
+        from framework.pages.home_page import HomePage
+
         hp = HomePage(self.ctx.driver, self.ctx.config.base_url)
         hp.switch_language(lang)
 
@@ -105,16 +276,10 @@ class StepsRegistry:
         """Then I expect page language is "<lang>"."""
         lang = m.group(1).lower()
         self.ctx.init_driver()
-        page_source = self.ctx.driver.page_source
-
-        if lang in ("uk", "ua", "ukrainian", "українська"):
-            expected_snippet = "Усі інструменти для успішного бізнесу"
-        else:
-            expected_snippet = "All tools for a successful business"
+        expected_snippet = _language_snippet(lang)
 
-        assert_contains(
-            page_source,
-            expected_snippet,
+        assert_true(
+            find_text(self.ctx.driver, expected_snippet) is not None,
             f'Expected language "{lang}" snippet "{expected_snippet}" not found on page',
         )
 
@@ -122,6 +287,15 @@ class StepsRegistry:
     # Додаткові кроки для головної сторінки kwiga.com
     # --------------------
 
+    def _page(self):
+        from framework.pages.base_page import BasePage
+
+        return BasePage(
+            self.ctx.driver,
+            self.ctx.config.base_url,
+            lookup_timeout=self.ctx.config.implicit_wait,
+        )
+
     def step_click_header_menu(self, m):
         """
         And I click header menu "<text>".
@@ -129,22 +303,16 @@ class StepsRegistry:
         """
         text = m.group(1)
         self.ctx.init_driver()
-        driver = self.ctx.driver
-
-        link = driver.find_element(By.LINK_TEXT, text)
-        link.click()
+        self._page().find_link(text).click()
 
     def step_click_footer_link(self, m):
         """
         And I click footer link "<text>".
-        Використовує LINK_TEXT, напр. "List of courses", "Book a demo".
+        Шукає лінк за видимим текстом, напр. "List of courses", "Book a demo".
         """
         text = m.group(1)
         self.ctx.init_driver()
-        driver = self.ctx.driver
-
-        link = driver.find_element(By.LINK_TEXT, text)
-        link.click()
+        self._page().find_link(text).click()
 
     def step_click_button(self, m):
         """
@@ -153,14 +321,7 @@ class StepsRegistry:
         """
         label = m.group(1)
         self.ctx.init_driver()
-        driver = self.ctx.driver
-
-        xpath = (
-            f"//a[normalize-space(.)='{label}' or contains(normalize-space(.), '{label}')]"
-            f" | //button[normalize-space(.)='{label}' or contains(normalize-space(.), '{label}')]"
-        )
-        element = driver.find_element(By.XPATH, xpath)
-        element.click()
+        self._page().find_button(label).click()
 
     def step_click_css(self, m):
         """
@@ -171,6 +332,8 @@ class StepsRegistry:
         self.ctx.init_driver()
         driver = self.ctx.driver
 
+        from selenium.webdriver.common.by import By
+
         element = driver.find_element(By.CSS_SELECTOR, selector)
         element.click()
 
@@ -179,40 +342,33 @@ class StepsRegistry:
         And I click header dropdown "<text>".
         Шукає елемент .header__menu_item_dropdown, який містить вказаний текст (наприклад, "Useful info").
         """
-        label = m.group(1).strip().lower()
         self.ctx.init_driver()
-        driver = self.ctx.driver
+        page = self._page()
 
-        items = driver.find_elements(By.CSS_SELECTOR, ".header__menu_item_dropdown")
-        for item in items:
-            text = item.text.strip().lower()
-            if label in text:
-                item.click()
-                return
+        item = page.find_dropdown(m.group(1))
+        if item is not None:
+            item.click()
+            return
 
-        visible_texts = [i.text.strip() for i in items]
         raise AssertionError(
             f'Header dropdown with text "{m.group(1)}" not found. '
-            f'Available dropdowns: {visible_texts}'
+            f'Available dropdowns: {page.dropdown_texts()}'
         )
 
     def step_expect_page_contains_text(self, m):
         """
         Then I expect page contains text "<snippet>".
-        Чекаємо до 10 секунд, поки текст з'явиться на сторінці.
+        Чекаємо до explicit_wait (10 секунд), поки текст з'явиться на сторінці.
+        Пошук іде всередині браузера, назад приходить лише фрагмент збігу.
         """
         snippet = m.group(1)
         self.ctx.init_driver()
-        driver = self.ctx.driver
 
-        WebDriverWait(driver, 10).until(
-            lambda d: snippet in d.page_source
+        found = wait_for_text(
+            self.ctx.driver, snippet, timeout=self.ctx.config.explicit_wait
         )
-
-        page_source = driver.page_source
-        assert_contains(
-            page_source,
-            snippet,
+        assert_true(
+            found is not None,
             f'Expected to find text "{snippet}" on page, but it was not found.',
         )
 
@@ -229,6 +385,85 @@ class StepsRegistry:
             f'Expected current URL to contain "{part}", got: {current_url}',
         )
 
+    # --------------------
+    # Швидкодія сторінки
+    # --------------------
+
+    def _page_metrics(self):
+        self.ctx.init_driver()
+        # чекаємо на load, якщо профіль eager повернув керування раніше
+        metrics = capture_page_metrics(self.ctx.driver, wait=self.ctx.config.explicit_wait)
+        assert_true(
+            metrics is not None,
+            "Navigation Timing is not available for the current page",
+        )
+        return metrics
+
+    def step_expect_page_load_under(self, m):
+        """Then I expect page load under <N> ms."""
+        limit = int(m.group(1))
+        metrics = self._page_metrics()
+        assert_true(
+            metrics.load_ms is not None,
+            f"Page load event did not fire within {self.ctx.config.explicit_wait}s: "
+            f"{metrics.url}",
+        )
+        assert_true(
+            metrics.load_ms < limit,
+            f"Expected page load under {limit} ms, got {metrics.load_ms:.0f} ms "
+            f"(TTFB {metrics.ttfb_ms:.0f} ms): {metrics.url}",
+        )
+
+    def step_expect_transferred_bytes_under(self, m):
+        """
+        Then I expect transferred bytes under <N> <B|KB|MB>.
+        Документ + ресурси за Resource Timing (крос-доменні без
+        Timing-Allow-Origin і кешовані браузер рахує як 0 байт).
+        """
+        limit = float(m.group(1)) * _BYTE_UNITS[m.group(2)]
+        metrics = self._page_metrics()
+        largest = ", ".join(
+            f"{item['url']} ({item['bytes'] / 1024:.0f} KB)" for item in metrics.largest
+        )
+        assert_true(
+            metrics.transfer_bytes < limit,
+            f"Expected transferred bytes under {m.group(1)} {m.group(2)}, got "
+            f"{metrics.transfer_bytes / 1024 / 1024:.2f} MB in "
+            f"{metrics.resource_count} resources; largest: {largest}",
+        )
+
+    # --------------------
+    # Пакетні перевірки (для послідовних read-only асертів)
+    # --------------------
+
+    def check_page_language(self, m) -> PageCheck:
+        lang = m.group(1).lower()
+        snippet = _language_snippet(lang)
+        return PageCheck(
+            "text",
+            snippet,
+            False,
+            lambda actual: f'Expected language "{lang}" snippet "{snippet}" not found on page',
+        )
+
+    def check_page_contains_text(self, m) -> PageCheck:
+        snippet = m.group(1)
+        return PageCheck(
+            "text",
+            snippet,
+            True,
+            lambda actual: f'Expected to find text "{snippet}" on page, but it was not found.',
+        )
+
+    def check_current_url_contains(self, m) -> PageCheck:
+        part = m.group(1)
+        return PageCheck(
+            "url",
+            part,
+            False,
+            lambda actual: f'Expected current URL to contain "{part}", got: {actual}',
+        )
+
     # --------------------
     # Крок для вкладки
     # --------------------
@@ -236,22 +471,112 @@ class StepsRegistry:
     def step_switch_to_new_tab(self, m):
         """
         And I switch to new tab.
-        Перемикаємось на останню вкладку (наприклад, Calendly).
+        Чекаємо, поки відкриється вкладка (наприклад, Calendly), і перемикаємось на неї.
         """
-        self.ctx.init_driver()
-        driver = self.ctx.driver
-
-        handles = driver.window_handles
-        if len(handles) > 1:
-            driver.switch_to.window(handles[-1])
+        timeout = self.ctx.config.explicit_wait
+        if not self.ctx.switch_to_new_window(timeout):
+            raise AssertionError(f"No new tab opened within {timeout} s")
 
     # --------------------
     # Виконання кроку
     # --------------------
 
-    def execute_step(self, step_text: str):
-        for pattern, func in self._steps:
-            m = pattern.match(step_text)
+    def _candidates(self, step_text: str) -> Iterator[int]:
+        # перевіряємо лише визначення, чий префікс є початком тексту кроку:
+        # вартість пошуку залежить від довжини тексту, а не від кількості
+        # зареєстрованих кроків
+        node = self._prefix_trie
+        yield from node.get(None, ())
+        for ch in step_text:
+            node = node.get(ch)
+            if node is None:
+                return
+            yield from node.get(None, ())
+
+    def match(self, step_text: str) -> Tuple[int, re.Match]:
+        """
+        Повертає (номер визначення, match) для тексту кроку.
+        Кидає UndefinedStepError / AmbiguousStepError.
+        """
+        found = []
+        for index in self._candidates(step_text):
+            m = self._steps[index].pattern.match(step_text)
             if m:
-                return func(m)
-        raise ValueError(f"No step definition matches: {step_text}")
+                found.append((index, m))
+
+        if not found:
+            raise UndefinedStepError(f"No step definition matches: {step_text}")
+        if len(found) > 1:
+            patterns = ", ".join(self._steps[i].pattern.pattern for i, _ in found)
+            raise AmbiguousStepError(
+                f"Step matches several definitions: {step_text} ({patterns})"
+            )
+        return found[0]
+
+    def execute_bound(self, step):
+        """Виконує крок, прив'язаний на етапі компіляції (див. plan.BoundStep)."""
+        return self._steps[step.definition].func(step.match)
+
+    def definition_name(self, step) -> str:
+        """Назва обробника, до якого прив'язано крок (для --dry-run)."""
+        return self._steps[step.definition].func.__name__
+
+    def supports_http(self, step) -> bool:
+        return self._steps[step.definition].http
+
+    def is_batchable(self, step) -> bool:
+        return self._steps[step.definition].check is not None
+
+    def is_shareable(self, step) -> bool:
+        """Крок може входити у спільний префікс сценаріїв (read-only асерти — завжди)."""
+        definition = self._steps[step.definition]
+        return definition.shared or definition.check is not None
+
+    def execute_batch(self, steps: Sequence) -> List[Optional[Exception]]:
+        """
+        Виконує послідовність read-only асертів одним викликом до браузера.
+        Повертає помилку (або None) для кожного кроку в тому ж порядку.
+        """
+        errors: List[Optional[Exception]] = [None] * len(steps)
+        batch: List[Tuple[int, PageCheck]] = []
+        for i, st in enumerate(steps):
+            try:
+                batch.append((i, self._steps[st.definition].check(st.match)))
+            except Exception as e:
+                # зіпсована перевірка валить лише свій крок
+                errors[i] = e
+        if not batch:
+            return errors
+
+        self.ctx.init_driver()
+        try:
+            outcomes = check_page(
+                self.ctx.driver,
+                [{"kind": c.kind, "value": c.value, "wait": c.wait} for _, c in batch],
+                timeout=self.ctx.config.explicit_wait,
+            )
+        except Exception:
+            # напр. сторінка перезавантажилась під час очікування —
+            # виконуємо кроки по одному
+            return [self.try_execute(st) for st in steps]
+
+        for (i, check), outcome in zip(batch, outcomes):
+            if outcome["ok"]:
+                continue
+            try:
+                errors[i] = AssertionError(check.message(outcome["detail"]))
+            except Exception as e:
+                errors[i] = e
+        return errors
+
+    def try_execute(self, step) -> Optional[Exception]:
+        """execute_bound, що повертає помилку замість того, щоб її кинути."""
+        try:
+            self.execute_bound(step)
+        except Exception as e:
+            return e
+        return None
+
+    def execute_step(self, step_text: str):
+        index, m = self.match(step_text)
+        return self._steps[index].func(m)
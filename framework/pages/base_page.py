@@ -1,17 +1,69 @@
+from framework.web.element_index import clickables, find_clickable
+from framework.web.http_backend import LINK_TEXT
+from framework.web.page_metrics import record_page_metrics
 from framework.web.waits import wait_visible, wait_all
 
 class BasePage:
-    def __init__(self, driver, base_url: str):
+    def __init__(self, driver, base_url: str, lookup_timeout: float = 5):
         self.driver = driver
         self.base_url = base_url.rstrip("/")
+        # скільки чекати на лінк/кнопку, якої ще нема в DOM
+        self.lookup_timeout = lookup_timeout
 
     def open(self, path: str = "/"):
         if not path.startswith("/"):
             path = "/" + path
         self.driver.get(self.base_url + path)
+        # Navigation/Resource Timing цього завантаження -> reports/page_metrics.json
+        record_page_metrics(self.driver)
 
     def find_visible(self, locator):
         return wait_visible(self.driver, locator)
 
     def find_all_visible(self, locator):
         return wait_all(self.driver, locator)
+
+    # --------------------
+    # Клікабельні елементи (див. web/element_index.py)
+    # --------------------
+
+    def find_link(self, text: str):
+        """Лінк з точно таким видимим текстом (як By.LINK_TEXT)."""
+        if not getattr(self.driver, "supports_js", True):
+            return self.driver.find_element(LINK_TEXT, text)
+        item = find_clickable(
+            self.driver,
+            lambda c: c.tag == "a" and c.text == text,
+            timeout=self.lookup_timeout,
+        )
+        if item is None:
+            from selenium.common.exceptions import NoSuchElementException
+
+            raise NoSuchElementException(f"Unable to locate link with text: {text!r}")
+        return item.element
+
+    def find_button(self, label: str):
+        """Перший у DOM лінк або кнопка, текст якої містить label."""
+        item = find_clickable(
+            self.driver,
+            lambda c: c.tag in ("a", "button") and label in c.content,
+            timeout=self.lookup_timeout,
+        )
+        if item is None:
+            from selenium.common.exceptions import NoSuchElementException
+
+            raise NoSuchElementException(f"Unable to locate button or link: {label!r}")
+        return item.element
+
+    def find_dropdown(self, label: str):
+        """Дропдаун хедера, видимий текст якого містить label (без регістру)."""
+        label = label.strip().lower()
+        item = find_clickable(
+            self.driver,
+            lambda c: c.dropdown and label in c.text.lower(),
+            timeout=self.lookup_timeout,
+        )
+        return None if item is None else item.element
+
+    def dropdown_texts(self):
+        return [c.text for c in clickables(self.driver) if c.dropdown]
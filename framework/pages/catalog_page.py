@@ -1,10 +1,10 @@
-from selenium.webdriver.common.by import By
 from .base_page import BasePage
 
 class CatalogPage(BasePage):
     # Бере всі лінки на піддомени *.kwiga.com – серед них будуть назви курсів
+    # "xpath" — значення By.XPATH (без імпорту selenium.webdriver)
     COURSE_TITLES = (
-        By.XPATH,
+        "xpath",
         "//a[contains(@href, '.kwiga.com')]"
     )
 
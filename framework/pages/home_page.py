@@ -1,14 +1,13 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from .base_page import BasePage
 
 class HomePage(BasePage):
     # Більш універсальний локатор для поля пошуку на каталозі Kwiga
+    # ("xpath" / "css selector" — значення By.*: без імпорту selenium.webdriver)
     SEARCH_INPUT = (
-        By.XPATH,
+        "xpath",
         "//input[contains(@placeholder, 'Щоб Ви хотіли вивчити сьогодні?')]"
     )
-    SEARCH_BUTTON = (By.CSS_SELECTOR, ".catalog-search__button")
+    SEARCH_BUTTON = ("css selector", ".catalog-search__button")
     
     def open_home(self):
         # base_url вже містить /ua, тому просто відкриваємо корінь
@@ -1,36 +1,146 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
 
+from framework.web.driver_resolver import resolve_driver_path
+from framework.web.instrumentation import command_stats, instrument_driver
+from framework.web.memory import MemoryStats
+
+
+# URL-шаблони для Network.setBlockedURLs: аналітика, трекери, чат-віджети,
+# медіа і шрифти — жоден крок їх не перевіряє, а чекати на load доводиться
+BLOCKED_URL_PATTERNS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googleadservices.com*",
+    "*facebook.net*",
+    "*facebook.com/tr*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*mc.yandex.ru*",
+    "*tiktok.com*",
+    "*intercom.io*",
+    "*intercomcdn.com*",
+    "*tawk.to*",
+    "*jivosite.com*",
+    "*crisp.chat*",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+    "*.mp3",
+)
+
+
+@dataclass(frozen=True)
+class DriverProfile:
+    page_load_strategy: str = "normal"
+    blocked_urls: Tuple[str, ...] = ()
+    disable_images: bool = False
+
+
+PERFORMANCE_PROFILES: Dict[str, DriverProfile] = {
+    "default": DriverProfile(),
+    # driver.get() повертається після DOMContentLoaded, а не після load
+    "eager": DriverProfile(page_load_strategy="eager"),
+    # блокування аналітики/трекерів/медіа/шрифтів через CDP (лише Chrome)
+    "block-third-party": DriverProfile(blocked_urls=BLOCKED_URL_PATTERNS),
+    "no-images": DriverProfile(disable_images=True),
+}
+
+
+def resolve_profile(names: str) -> DriverProfile:
+    """
+    Профілі можна комбінувати через кому: "eager,block-third-party,no-images".
+    """
+    strategy = "normal"
+    blocked: List[str] = []
+    disable_images = False
+    for name in (n.strip() for n in names.split(",")):
+        if not name:
+            continue
+        if name not in PERFORMANCE_PROFILES:
+            raise ValueError(
+                f"Unknown performance profile: {name}. "
+                f"Available: {', '.join(PERFORMANCE_PROFILES)}"
+            )
+        profile = PERFORMANCE_PROFILES[name]
+        if profile.page_load_strategy != "normal":
+            strategy = profile.page_load_strategy
+        blocked.extend(u for u in profile.blocked_urls if u not in blocked)
+        disable_images = disable_images or profile.disable_images
+    return DriverProfile(strategy, tuple(blocked), disable_images)
+
+
+def create_driver(
+    browser: str = "chrome",
+    headless: bool = True,
+    implicit_wait: int = 5,
+    driver_path: Optional[str] = None,
+    offline: bool = False,
+    extra_args: Sequence[str] = (),
+    profile: str = "default",
+    chrome_args: Sequence[str] = (),
+):
+    # selenium.webdriver імпортується лише коли драйвер справді потрібен:
+    # це більша частина часу старту раннера
+    from selenium import webdriver
 
-def create_driver(browser: str = "chrome", headless: bool = True, implicit_wait: int = 5):
     browser = browser.lower()
+    perf = resolve_profile(profile)
 
     if browser == "chrome":
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+        from selenium.webdriver.chrome.service import Service as ChromeService
+
         options = ChromeOptions()
         if headless:
             options.add_argument("--headless=new")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
+        for arg in (*extra_args, *chrome_args):
+            options.add_argument(arg)
+        options.page_load_strategy = perf.page_load_strategy
+        # консоль браузера для артефактів впалих кроків (core/artifacts.py)
+        options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+        if perf.disable_images:
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
 
-        service = ChromeService(ChromeDriverManager().install())
+        service = ChromeService(resolve_driver_path("chrome", driver_path, offline))
         driver = webdriver.Chrome(service=service, options=options)
+        _apply_target_profile(driver, perf)
 
     elif browser == "firefox":
+        from selenium.webdriver.firefox.options import Options as FirefoxOptions
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+
         options = FirefoxOptions()
         if headless:
             options.add_argument("-headless")
+        for arg in extra_args:
+            options.add_argument(arg)
+        options.page_load_strategy = perf.page_load_strategy
+        if perf.disable_images:
+            options.set_preference("permissions.default.image", 2)
+        # blocked_urls працює через CDP, тобто лише в Chrome
 
-        service = FirefoxService(GeckoDriverManager().install())
+        service = FirefoxService(resolve_driver_path("firefox", driver_path, offline))
         driver = webdriver.Firefox(service=service, options=options)
 
     else:
         raise ValueError(f"Unsupported browser: {browser}")
 
+    instrument_driver(driver)
     driver.implicitly_wait(implicit_wait)
     try:
         driver.maximize_window()
@@ -39,3 +149,492 @@ def create_driver(browser: str = "chrome", headless: bool = True, implicit_wait:
         pass
 
     return driver
+
+
+def _apply_target_profile(driver, perf: DriverProfile):
+    # CDP-налаштування діють на одну вкладку (target), а не на весь браузер
+    if perf.blocked_urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": list(perf.blocked_urls)}
+        )
+
+
+@dataclass
+class IsolatedContext:
+    """Incognito browser context зі своєю вкладкою, на яку перемкнено драйвер."""
+    context_id: str
+    target_id: str
+    home_handle: str
+
+
+def open_isolated_context(driver, profile: str = "default") -> Optional[IsolatedContext]:
+    """
+    Створює через CDP новий browser context (окремі cookies, storage, кеш)
+    з вкладкою в ньому і перемикає на неї драйвер — ізоляція сценарію без
+    запуску нового браузера. None — браузер без CDP (Firefox).
+    """
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return None
+
+    home_handle = driver.current_window_handle
+    size = driver.get_window_size()
+    context_id = driver.execute_cdp_cmd(
+        "Target.createBrowserContext", {"disposeOnDetach": True}
+    )["browserContextId"]
+    isolated = IsolatedContext(context_id, "", home_handle)
+    try:
+        isolated.target_id = driver.execute_cdp_cmd(
+            "Target.createTarget",
+            {
+                "url": "about:blank",
+                "browserContextId": context_id,
+                # той самий розмір вікна — адаптивна верстка не повинна змінитись
+                "width": size["width"],
+                "height": size["height"],
+            },
+        )["targetId"]
+        # у chromedriver дескриптор вікна — це targetId
+        driver.switch_to.window(isolated.target_id)
+        _apply_target_profile(driver, resolve_profile(profile))
+    except Exception:
+        close_isolated_context(driver, isolated)
+        raise
+    return isolated
+
+
+def close_isolated_context(driver, isolated: IsolatedContext):
+    """Закриває всі вкладки контексту разом з його cookies і storage."""
+    driver.switch_to.window(isolated.home_handle)
+    driver.execute_cdp_cmd(
+        "Target.disposeBrowserContext", {"browserContextId": isolated.context_id}
+    )
+
+
+# усе, що сайт міг зберегти в браузері, крім cookies (їх чистить окрема команда)
+_STORAGE_TYPES = "local_storage,indexeddb,cache_storage,service_workers,websql,file_systems"
+
+_CLEAR_STORAGE_JS = (
+    "try { window.localStorage.clear(); } catch (e) {}"
+    "try { window.sessionStorage.clear(); } catch (e) {}"
+)
+
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _tab_origins(driver) -> Set[str]:
+    """Origins, відвідані в поточній вкладці (історія навігації через CDP)."""
+    urls = [driver.current_url]
+    if hasattr(driver, "execute_cdp_cmd"):
+        entries = driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]
+        urls.extend(entry["url"] for entry in entries)
+    return {origin for origin in map(_origin, urls) if origin}
+
+
+def _clear_origins(driver, origins: Set[str]):
+    if not hasattr(driver, "execute_cdp_cmd"):
+        # без CDP (Firefox) storage чиститься лише зі сторінки свого origin
+        for origin in origins:
+            if _origin(driver.current_url) != origin:
+                driver.get(origin + "/robots.txt")
+            driver.execute_script(_CLEAR_STORAGE_JS)
+        return
+
+    for origin in origins:
+        driver.execute_cdp_cmd(
+            "Storage.clearDataForOrigin",
+            {"origin": origin, "storageTypes": _STORAGE_TYPES},
+        )
+        try:
+            # sessionStorage Storage.* не чіпає — він живе у вкладці
+            driver.execute_cdp_cmd(
+                "DOMStorage.clear",
+                {"storageId": {"securityOrigin": origin, "isLocalStorage": False}},
+            )
+        except Exception:
+            pass
+    # інакше історія (і список origins) накопичується між сценаріями
+    driver.execute_cdp_cmd("Page.resetNavigationHistory", {})
+
+
+def reset_driver_state(driver):
+    """
+    Дешево повертає сесію до "чистого" стану між сценаріями: закриває зайві
+    вкладки, чистить storage усіх відвіданих origins (а не лише відкритого
+    зараз) і cookies усіх доменів, відкриває about:blank.
+    """
+    handles = driver.window_handles
+    main_handle = handles[0]
+    origins: Set[str] = set()
+    for handle in reversed(handles):
+        driver.switch_to.window(handle)
+        origins |= _tab_origins(driver)
+        if handle != main_handle:
+            driver.close()
+    try:
+        driver.execute_script(_CLEAR_STORAGE_JS)
+    except Exception:
+        # about:blank / data: сторінки не мають storage
+        pass
+    _clear_origins(driver, origins)
+
+    try:
+        # CDP чистить cookies всіх доменів, а не лише поточної сторінки
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except Exception:
+        driver.delete_all_cookies()
+
+    driver.get("about:blank")
+
+
+# CookieParam для Network.setCookies: решту полів Network.getAllCookies
+# (size, session, ...) CDP на вході не приймає
+_COOKIE_PARAMS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+)
+
+_STORAGE_JS = """
+var dump = function (storage) {
+  var items = {};
+  try {
+    for (var i = 0; i < storage.length; i++) {
+      var key = storage.key(i);
+      items[key] = storage.getItem(key);
+    }
+  } catch (e) {}
+  return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# виконується на новому документі до скриптів сторінки: storage вже на місці,
+# коли сайт його читає, тож другий page load не потрібен
+_RESTORE_STORAGE_JS = """
+(function (origin, local, session) {
+  if (window !== window.top || location.origin !== origin) return;
+  var fill = function (storage, items) {
+    try {
+      storage.clear();
+      for (var key in items) storage.setItem(key, items[key]);
+    } catch (e) {}
+  };
+  fill(window.localStorage, local);
+  fill(window.sessionStorage, session);
+})(%s, %s, %s);
+"""
+
+
+@dataclass
+class BrowserState:
+    """Знімок стану вкладки після спільного префікса сценаріїв (--share-prefixes)."""
+    url: str
+    handle: str
+    # усі вкладки на момент знімка; решту restore_browser_state закриває
+    handles: Tuple[str, ...]
+    cookies: List[dict]
+    local_storage: Dict[str, str]
+    session_storage: Dict[str, str]
+
+
+def capture_browser_state(
+    driver, ignore_handles: Sequence[str] = ()
+) -> Optional[BrowserState]:
+    """
+    URL, cookies і storage поточної вкладки. None — відкрито більше однієї
+    вкладки (стан кількох вікон не відновити). ignore_handles — службові
+    вкладки, напр. домашня вкладка ізольованого контексту.
+    """
+    handles = tuple(driver.window_handles)
+    if len([h for h in handles if h not in ignore_handles]) > 1:
+        return None
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    except Exception:
+        # без CDP — лише cookies поточного домену
+        cookies = driver.get_cookies()
+    storage = driver.execute_script(_STORAGE_JS) or {}
+    return BrowserState(
+        url=driver.current_url,
+        handle=driver.current_window_handle,
+        handles=handles,
+        cookies=cookies,
+        local_storage=storage.get("local") or {},
+        session_storage=storage.get("session") or {},
+    )
+
+
+def restore_browser_state(driver, state: BrowserState):
+    """
+    Повертає вкладку до знімка: закриває нові вкладки, замінює cookies і
+    storage та відкриває збережений URL — одним page load, якщо є CDP.
+    """
+    handles = driver.window_handles
+    if state.handle in handles:
+        for handle in handles:
+            if handle not in state.handles:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(state.handle)
+    # інакше це вже інша сесія (попередню викинули після збою) —
+    # стан відновлюється в її поточній вкладці
+
+    try:
+        driver.execute_script(
+            "try { window.localStorage.clear(); } catch (e) {}"
+            "try { window.sessionStorage.clear(); } catch (e) {}"
+        )
+    except Exception:
+        pass
+
+    if not hasattr(driver, "execute_cdp_cmd"):
+        _restore_without_cdp(driver, state)
+        return
+
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    cookies = [
+        {key: cookie[key] for key in _COOKIE_PARAMS if key in cookie}
+        for cookie in state.cookies
+    ]
+    for cookie in cookies:
+        # сесійні cookies приходять з expires=-1
+        if cookie.get("expires", 0) < 0:
+            del cookie["expires"]
+    if cookies:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+    origin = urlsplit(state.url)
+    script_id = None
+    if (state.local_storage or state.session_storage) and origin.scheme in ("http", "https"):
+        script_id = driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {
+                "source": _RESTORE_STORAGE_JS % (
+                    json.dumps(f"{origin.scheme}://{origin.netloc}"),
+                    json.dumps(state.local_storage),
+                    json.dumps(state.session_storage),
+                )
+            },
+        )["identifier"]
+    try:
+        driver.get(state.url)
+    finally:
+        if script_id is not None:
+            driver.execute_cdp_cmd(
+                "Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id}
+            )
+
+
+def _restore_without_cdp(driver, state: BrowserState):
+    # Firefox: cookies ставляться лише для домену відкритої сторінки,
+    # а storage — вже після завантаження, тож потрібне перезавантаження
+    driver.get(state.url)
+    driver.delete_all_cookies()
+    for cookie in state.cookies:
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            pass
+    driver.execute_script(
+        "var fill = function (storage, items) {"
+        "  try { storage.clear(); for (var k in items) storage.setItem(k, items[k]); }"
+        "  catch (e) {}"
+        "};"
+        "fill(window.localStorage, arguments[0]);"
+        "fill(window.sessionStorage, arguments[1]);",
+        state.local_storage,
+        state.session_storage,
+    )
+    driver.refresh()
+
+
+class _PooledSession:
+    def __init__(self, key, driver):
+        self.key = key
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Пул "теплих" WebDriver-сесій з ключем (browser, headless, опції драйвера):
+    сесії з різними профілями/аргументами між собою не взаємозамінні.
+
+    acquire() віддає вільну сесію (hit) або запускає нову (miss),
+    release() скидає стан сесії і повертає її в пул. Сесія перезапускається
+    після max_uses сценаріїв, якщо сценарій/скидання завершились помилкою
+    або якщо браузер з'їв більше за memory.max_rss_mb пам'яті.
+    """
+
+    def __init__(self, max_uses: int = 20, memory: Optional[MemoryStats] = None):
+        self.max_uses = max_uses
+        self.memory = memory if memory is not None else MemoryStats()
+        self._lock = threading.Lock()
+        self._idle: Dict[tuple, List[_PooledSession]] = {}
+        self._sessions: Dict[int, _PooledSession] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.launch_times: List[float] = []
+        self.reset_times: List[float] = []
+        # помилки warm(); друкуються в report(), а не посеред логів фіч
+        self.warm_errors: List[str] = []
+        # профіль -> [кількість driver.get(), секунди] по всіх сесіях
+        self.page_loads: Dict[str, List[float]] = {}
+
+    @staticmethod
+    def _key(browser: str, headless: bool, options: dict) -> tuple:
+        return (browser.lower(), headless, tuple(sorted(options.items())))
+
+    def _launch(self, key, options) -> _PooledSession:
+        browser, headless, _ = key
+        started = time.perf_counter()
+        driver = create_driver(browser=browser, headless=headless, **options)
+        session = _PooledSession(key, driver)
+        with self._lock:
+            self.launch_times.append(time.perf_counter() - started)
+            self._sessions[id(driver)] = session
+        return session
+
+    def warm(self, browser: str, headless: bool, count: int, **options):
+        """
+        Паралельно запускає count сесій заздалегідь.
+        options передаються в create_driver (implicit_wait, driver_path, ...).
+        """
+        key = self._key(browser, headless, options)
+
+        def launch(_):
+            try:
+                return self._launch(key, options)
+            except Exception as e:
+                # не валимо запуск: acquire() ще раз спробує створити сесію
+                with self._lock:
+                    self.warm_errors.append(f"{browser}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(count, 1)) as executor:
+            sessions = [s for s in executor.map(launch, range(count)) if s is not None]
+        with self._lock:
+            self._idle.setdefault(key, []).extend(sessions)
+
+    def acquire(self, browser: str = "chrome", headless: bool = True, **options):
+        key = self._key(browser, headless, options)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.hits += 1
+                return idle.pop().driver
+            self.misses += 1
+        return self._launch(key, options).driver
+
+    def release(self, driver, discard: bool = False, reset: bool = True):
+        """
+        reset=False — стан сесії вже чистий (сценарій працював в ізольованому
+        browser context, див. open_isolated_context), скидання не потрібне.
+        """
+        with self._lock:
+            session = self._sessions.get(id(driver))
+        if session is None:
+            # драйвер створений поза пулом
+            driver.quit()
+            return
+
+        session.uses += 1
+        if not discard and session.uses < self.max_uses and self.memory.over_limit(driver):
+            discard = True
+        if not discard and session.uses < self.max_uses and not reset:
+            with self._lock:
+                self._idle.setdefault(session.key, []).append(session)
+            return
+        if not discard and session.uses < self.max_uses:
+            started = time.perf_counter()
+            try:
+                reset_driver_state(driver)
+            except Exception:
+                discard = True
+            else:
+                with self._lock:
+                    self.reset_times.append(time.perf_counter() - started)
+                    self._idle.setdefault(session.key, []).append(session)
+                return
+
+        self._discard(session)
+
+    def _collect_page_loads(self, session: _PooledSession):
+        stats = command_stats(session.driver)
+        if stats is None:
+            return
+        count, seconds = stats.page_loads, stats.page_load_seconds
+        profile = dict(session.key[2]).get("profile", "default")
+        with self._lock:
+            entry = self.page_loads.setdefault(profile, [0, 0.0])
+            entry[0] += count
+            entry[1] += seconds
+
+    def _discard(self, session: _PooledSession):
+        with self._lock:
+            self._sessions.pop(id(session.driver), None)
+            self.recycled += 1
+        self._collect_page_loads(session)
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+
+    def shutdown(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._idle.clear()
+        for session in sessions:
+            self._collect_page_loads(session)
+            try:
+                session.driver.quit()
+            except Exception:
+                pass
+
+    def page_load_report(self) -> str:
+        """Середній час driver.get() по профілях (для порівняння профілів між прогонами)."""
+        lines = []
+        for profile, (count, seconds) in sorted(self.page_loads.items()):
+            if count:
+                lines.append(
+                    "Page loads [{}]: {} x avg {:.0f} ms".format(
+                        profile, int(count), seconds / count * 1000
+                    )
+                )
+        return "\n".join(lines)
+
+    def report(self) -> str:
+        def avg_ms(values: List[float]) -> float:
+            return sum(values) / len(values) * 1000 if values else 0.0
+
+        report = (
+            "Driver pool: {} hits, {} misses, {} recycled; "
+            "launch avg {:.0f} ms ({}x), reset avg {:.0f} ms ({}x)".format(
+                self.hits,
+                self.misses,
+                self.recycled,
+                avg_ms(self.launch_times),
+                len(self.launch_times),
+                avg_ms(self.reset_times),
+                len(self.reset_times),
+            )
+        )
+        if self.warm_errors:
+            report += "\n  {} pre-launch failure(s), first: {}".format(
+                len(self.warm_errors), self.warm_errors[0]
+            )
+        return report
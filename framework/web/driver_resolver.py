@@ -0,0 +1,212 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Кеш шляхів до драйверів спільний для всіх запусків на машині
+# (можна перевизначити через KWIGA_DRIVER_CACHE, напр. для CI-агента)
+CACHE_DIR = Path(
+    os.environ.get("KWIGA_DRIVER_CACHE", Path.home() / ".cache" / "kwiga-bdd")
+)
+CACHE_FILE = CACHE_DIR / "drivers.json"
+LOCK_FILE = CACHE_DIR / "drivers.lock"
+
+BROWSERS = {
+    "chrome": {
+        "driver": "chromedriver",
+        "binaries": (
+            "google-chrome",
+            "google-chrome-stable",
+            "chromium",
+            "chromium-browser",
+            "chrome",
+        ),
+        "registry_key": r"Software\Google\Chrome\BLBeacon",
+    },
+    "firefox": {
+        "driver": "geckodriver",
+        "binaries": ("firefox",),
+        "registry_key": r"Software\Mozilla\Mozilla Firefox",
+    },
+}
+
+VERSION_RE = re.compile(r"\d+(?:\.\d+)+")
+
+# шляхи, визначені в цьому процесі: резолвимо один раз на процес
+_resolved: Dict[str, str] = {}
+_resolved_lock = threading.Lock()
+
+
+class FileLock:
+    """
+    Простий міжпроцесний лок на основі O_EXCL-файлу (працює і на Windows-агентах).
+    Лок, старший за stale_after секунд, вважаємо покинутим.
+    """
+
+    def __init__(self, path: Path, timeout: float = 120.0, stale_after: float = 300.0):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.stale_after:
+                        self.path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Could not acquire lock {self.path}")
+                time.sleep(0.1)
+            else:
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return self
+
+    def __exit__(self, *exc):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def detect_browser_version(browser: str) -> Optional[str]:
+    info = BROWSERS[browser]
+
+    if sys.platform.startswith("win"):
+        try:
+            import winreg
+
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, info["registry_key"]) as key:
+                value, _ = winreg.QueryValueEx(key, "version")
+            return str(value)
+        except Exception:
+            return None
+
+    for name in info["binaries"]:
+        binary = shutil.which(name)
+        if binary is None:
+            continue
+        try:
+            output = subprocess.run(
+                [binary, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            ).stdout
+        except Exception:
+            continue
+        match = VERSION_RE.search(output)
+        if match:
+            return match.group(0)
+    return None
+
+
+def _load_cache() -> Dict[str, Dict[str, str]]:
+    try:
+        with CACHE_FILE.open(encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_cache(cache: Dict[str, Dict[str, str]]):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, CACHE_FILE)
+
+
+def _install(browser: str) -> str:
+    if browser == "chrome":
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        return ChromeDriverManager().install()
+    from webdriver_manager.firefox import GeckoDriverManager
+
+    return GeckoDriverManager().install()
+
+
+def _resolve(
+    browser: str, configured_path: Optional[str], offline: bool
+) -> Tuple[str, str]:
+    info = BROWSERS[browser]
+
+    if configured_path:
+        if not os.path.exists(configured_path):
+            raise FileNotFoundError(f"Configured driver not found: {configured_path}")
+        return configured_path, "configured"
+
+    version = None if offline else detect_browser_version(browser)
+
+    with FileLock(LOCK_FILE):
+        cache = _load_cache()
+        entry = cache.get(browser)
+        if entry and os.path.exists(entry["path"]):
+            # в офлайні версію не перевіряємо — кращого варіанту все одно нема
+            if offline or version is None or entry.get("browser_version") == version:
+                return entry["path"], "cache"
+
+        if offline:
+            system_path = shutil.which(info["driver"])
+            if system_path:
+                return system_path, "PATH"
+            raise RuntimeError(
+                f"Offline mode: no cached {info['driver']} and none on PATH. "
+                "Set Config.driver_path (--driver-path) or run once online."
+            )
+
+        # тримаємо лок, поки качаємо: паралельні воркери дочекаються
+        # і візьмуть уже готовий шлях з кешу
+        path = _install(browser)
+        cache[browser] = {
+            "path": path,
+            "browser_version": version,
+            "resolved_at": datetime.now(timezone.utc).isoformat(),
+        }
+        _save_cache(cache)
+        return path, "download"
+
+
+def resolve_driver_path(
+    browser: str, configured_path: Optional[str] = None, offline: bool = False
+) -> str:
+    """
+    Повертає шлях до драйвера для browser ("chrome" / "firefox").
+    Порядок: явно заданий шлях -> дисковий кеш (якщо версія браузера збігається)
+    -> webdriver_manager; в офлайн-режимі замість завантаження — системний PATH.
+    """
+    browser = browser.lower()
+    if browser not in BROWSERS:
+        raise ValueError(f"Unsupported browser: {browser}")
+
+    with _resolved_lock:
+        if browser in _resolved:
+            return _resolved[browser]
+
+        started = time.perf_counter()
+        path, source = _resolve(browser, configured_path, offline)
+        _resolved[browser] = path
+        print(
+            "[driver] {} resolved to {} ({}) in {:.0f} ms".format(
+                BROWSERS[browser]["driver"],
+                path,
+                source,
+                (time.perf_counter() - started) * 1000,
+            )
+        )
+        return path
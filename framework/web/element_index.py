@@ -0,0 +1,114 @@
+"""
+Індекс клікабельних елементів сторінки (лінки, кнопки, дропдауни хедера).
+
+Один виклик execute_script збирає всі елементи з нормалізованим текстом;
+наступні пошуки на тій самій сторінці йдуть по індексу в Python. Сторінка
+тримає токен "документ:версія" — MutationObserver збільшує версію при
+будь-якій зміні DOM, а новий документ (навігація) має новий id. Якщо токен
+не змінився, скрипт повертає лише його, без повторного збору елементів.
+"""
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+_COLLECT_JS = r"""
+var known = arguments[0];
+var state = window.__kwigaClickables;
+if (!state) {
+    state = window.__kwigaClickables = {
+        id: Math.random().toString(36).slice(2), version: 0
+    };
+    new MutationObserver(function () { state.version++; }).observe(document, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ["class", "style", "hidden", "href"]
+    });
+}
+var token = state.id + ":" + state.version;
+var ready = document.readyState === "complete";
+if (token === known) { return {token: token, ready: ready, items: null}; }
+
+function norm(s) { return (s || "").replace(/\s+/g, " ").trim(); }
+var nodes = document.querySelectorAll("a, button, .header__menu_item_dropdown");
+var items = [];
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var style = window.getComputedStyle(el);
+    var visible = el.getClientRects().length > 0
+        && style.visibility !== "hidden" && style.display !== "none";
+    items.push({
+        element: el,
+        tag: el.tagName.toLowerCase(),
+        dropdown: el.classList.contains("header__menu_item_dropdown"),
+        // як WebElement.text: видимий текст, для прихованих — порожній
+        text: visible ? norm(el.innerText) : "",
+        content: norm(el.textContent),
+        visible: visible
+    });
+}
+return {token: token, ready: ready, items: items};
+"""
+
+
+@dataclass
+class Clickable:
+    element: Any
+    tag: str
+    dropdown: bool
+    text: str
+    content: str
+    visible: bool
+
+
+@dataclass
+class _PageIndex:
+    token: Optional[str] = None
+    items: List[Clickable] = field(default_factory=list)
+
+
+# драйвер -> індекс поточної сторінки
+_indexes = weakref.WeakKeyDictionary()
+
+
+def _refresh(driver) -> Tuple[_PageIndex, bool, bool]:
+    """Один виклик до браузера. Повертає (індекс, сторінка завантажена, індекс змінився)."""
+    index = _indexes.get(driver)
+    if index is None:
+        index = _indexes[driver] = _PageIndex()
+    result = driver.execute_script(_COLLECT_JS, index.token)
+    changed = result["items"] is not None
+    if changed:
+        index.token = result["token"]
+        index.items = [Clickable(**item) for item in result["items"]]
+    return index, result["ready"], changed
+
+
+def clickables(driver) -> List[Clickable]:
+    """Актуальний список клікабельних елементів сторінки."""
+    return _refresh(driver)[0].items
+
+
+def find_clickable(
+    driver,
+    predicate: Callable[[Clickable], bool],
+    timeout: float = 5,
+    settle: float = 0.5,
+) -> Optional[Clickable]:
+    """
+    Перший елемент індексу, що задовольняє predicate, або None.
+    Якщо збігу нема, чекаємо змін DOM, але не довше timeout; завантажена
+    сторінка, DOM якої не змінювався settle секунд, — це остаточний промах.
+    """
+    deadline = time.monotonic() + timeout
+    quiet_since = time.monotonic()
+    while True:
+        index, ready, changed = _refresh(driver)
+        now = time.monotonic()
+        if changed:
+            quiet_since = now
+        for item in index.items:
+            if predicate(item):
+                return item
+        if now >= deadline or (ready and now - quiet_since >= settle):
+            return None
+        time.sleep(0.1)
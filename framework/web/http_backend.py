@@ -0,0 +1,320 @@
+"""
+Легкий HTTP-бекенд для сценаріїв, яким не потрібен справжній браузер.
+
+HttpDriver реалізує ту частину API WebDriver, якою користуються прості кроки:
+get(), page_source, current_url, пошук лінка за текстом і click() по ньому.
+Сторінки завантажуються через пул keep-alive з'єднань і розбираються
+стандартним html.parser — без JavaScript і рендерингу.
+"""
+import gzip
+import http.client
+import threading
+import time
+import zlib
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from framework.web.instrumentation import attach_stats
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+MAX_REDIRECTS = 10
+
+# значення By.LINK_TEXT / By.PARTIAL_LINK_TEXT (без імпорту selenium.webdriver)
+LINK_TEXT = "link text"
+PARTIAL_LINK_TEXT = "partial link text"
+
+# бекенди виконання сценарію (див. plan.ScenarioPlan.backend)
+BROWSER_BACKEND = "browser"
+HTTP_BACKEND = "http"
+
+
+class HttpClient:
+    """Потокобезпечний пул keep-alive з'єднань по (scheme, host, port)."""
+
+    def __init__(self, timeout: float = 30, max_idle_per_host: int = 8):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def _connect(self, scheme: str, host: str, port: int) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        # *.localhost (snapshot-сервер) — завжди loopback, як у браузері
+        address = "127.0.0.1" if host == "localhost" or host.endswith(".localhost") else host
+        return http.client.HTTPConnection(address, port, timeout=self.timeout)
+
+    def request(
+        self, method: str, url: str, headers: Dict[str, str]
+    ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        request_headers = dict(headers)
+        request_headers["Host"] = parts.netloc
+
+        with self._lock:
+            self.requests += 1
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        reused = conn is not None
+
+        while True:
+            if conn is None:
+                conn = self._connect(scheme, host, port)
+            try:
+                conn.request(method, target, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                conn = None
+                # сервер міг закрити keep-alive з'єднання — одна повторна спроба
+                if not reused:
+                    raise
+                reused = False
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+        return response.status, response.getheaders(), body
+
+    def close(self):
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+
+# спільний пул з'єднань для всіх HttpDriver (і всіх воркерів)
+default_client = HttpClient()
+
+
+class _PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text_parts: List[str] = []
+        self.links: List[dict] = []
+        self._open_links: List[dict] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: v or "" for k, v in attrs}
+        if tag == "a":
+            link = {"attrs": attrs, "text": []}
+            self.links.append(link)
+            self._open_links.append(link)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._open_links:
+            self._open_links.pop()
+
+    def handle_data(self, data):
+        self.text_parts.append(data)
+        for link in self._open_links:
+            link["text"].append(data)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class HttpElement:
+    def __init__(self, driver: "HttpDriver", tag: str, attrs: Dict[str, str], text: str):
+        self._driver = driver
+        self.tag_name = tag
+        self._attrs = attrs
+        self.text = text
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        value = self._attrs.get(name)
+        if name == "href" and value is not None:
+            return urljoin(self._driver.current_url, value)
+        return value
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def click(self):
+        href = self._attrs.get("href", "").strip()
+        if href and not href.startswith(("javascript:", "#")):
+            self._driver.get(urljoin(self._driver.current_url, href))
+
+
+class HttpDriver:
+    """Підмножина WebDriver API поверх HTTP-клієнта і html.parser."""
+
+    # waits.* перевіряють цей прапорець і шукають текст у Python
+    supports_js = False
+
+    def __init__(self, client: HttpClient = default_client):
+        self.client = client
+        self.current_url = "about:blank"
+        self.page_source = ""
+        self.status = 0
+        self._cookies: Dict[str, Dict[str, str]] = {}
+        self._parsed: Optional[_PageParser] = None
+        # кожен get() (разом з редиректами) рахується як WebDriver-команда "get" (див. instrumentation)
+        self.stats = attach_stats(self)
+
+    # --------------------
+    # Навігація
+    # --------------------
+
+    def get(self, url: str):
+        started = time.perf_counter()
+        try:
+            self._load(url)
+        finally:
+            self.stats.record("get", time.perf_counter() - started, {"url": url})
+
+    def _load(self, url: str):
+        for _ in range(MAX_REDIRECTS):
+            status, headers, body = self.client.request("GET", url, self._headers(url))
+            self._store_cookies(url, headers)
+            location = next((v for k, v in headers if k.lower() == "location"), None)
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            break
+        else:
+            raise RuntimeError(f"Too many redirects: {url}")
+
+        self.status = status
+        self.current_url = url
+        self.page_source = self._decode(headers, body)
+        self._parsed = None
+
+    def _headers(self, url: str) -> Dict[str, str]:
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        cookie = self._cookie_header(urlsplit(url).hostname or "")
+        if cookie:
+            headers["Cookie"] = cookie
+        return headers
+
+    @staticmethod
+    def _decode(headers, body: bytes) -> str:
+        encoding = ""
+        charset = "utf-8"
+        for name, value in headers:
+            lower = name.lower()
+            if lower == "content-encoding":
+                encoding = value.lower()
+            elif lower == "content-type" and "charset=" in value.lower():
+                charset = value.lower().split("charset=", 1)[1].split(";")[0].strip()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        return body.decode(charset, errors="replace")
+
+    def _store_cookies(self, url: str, headers):
+        host = urlsplit(url).hostname or ""
+        for name, value in headers:
+            if name.lower() != "set-cookie":
+                continue
+            pair, *attributes = value.split(";")
+            cookie_name, _, cookie_value = pair.strip().partition("=")
+            domain = host
+            for attribute in attributes:
+                key, _, attr_value = attribute.strip().partition("=")
+                if key.lower() == "domain" and attr_value:
+                    domain = attr_value.lstrip(".").lower()
+            self._cookies.setdefault(domain, {})[cookie_name] = cookie_value
+
+    def _cookie_header(self, host: str) -> str:
+        pairs = []
+        for domain, cookies in self._cookies.items():
+            if host == domain or host.endswith("." + domain):
+                pairs.extend(f"{k}={v}" for k, v in cookies.items())
+        return "; ".join(pairs)
+
+    # --------------------
+    # Сторінка
+    # --------------------
+
+    @property
+    def _page(self) -> _PageParser:
+        if self._parsed is None:
+            parser = _PageParser()
+            parser.feed(self.page_source)
+            parser.close()
+            self._parsed = parser
+        return self._parsed
+
+    @property
+    def window_handles(self) -> List[str]:
+        return ["main"]
+
+    def find_text(self, text: str, context: int = 40) -> Optional[str]:
+        """Те саме, що waits.find_text у браузері: спершу текст, потім HTML."""
+        for haystack in ("".join(self._page.text_parts), self.page_source):
+            index = haystack.find(text)
+            if index >= 0:
+                start = max(0, index - context)
+                return _normalize(haystack[start:index + len(text) + context])
+        return None
+
+    def check_page(self, checks: List[dict], context: int = 40) -> List[dict]:
+        results = []
+        for check in checks:
+            if check["kind"] == "url":
+                results.append(
+                    {"ok": check["value"] in self.current_url, "detail": self.current_url}
+                )
+            else:
+                found = self.find_text(check["value"], context)
+                results.append({"ok": found is not None, "detail": found})
+        return results
+
+    def find_elements(self, by: str, value: str) -> List[HttpElement]:
+        if by not in (LINK_TEXT, PARTIAL_LINK_TEXT):
+            raise NotImplementedError(f"HTTP backend cannot locate elements by {by}")
+        found = []
+        for link in self._page.links:
+            text = _normalize("".join(link["text"]))
+            if (by == LINK_TEXT and text == value) or (
+                by == PARTIAL_LINK_TEXT and value in text
+            ):
+                found.append(HttpElement(self, "a", link["attrs"], text))
+        return found
+
+    def find_element(self, by: str, value: str) -> HttpElement:
+        found = self.find_elements(by, value)
+        if not found:
+            # той самий виняток, що ловлять page objects (вони й так імпортують selenium)
+            from selenium.common.exceptions import NoSuchElementException
+
+            raise NoSuchElementException(f"Unable to locate element: {by}={value!r}")
+        return found[0]
+
+    def quit(self):
+        self._cookies.clear()
+        self.page_source = ""
+        self._parsed = None
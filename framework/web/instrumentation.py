@@ -0,0 +1,80 @@
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+
+class CommandStats:
+    """Лічильник WebDriver-команд одного драйвера: кількість і сумарний час."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # назва команди (get, findElement, executeScript, ...) -> [кількість, секунди]
+        self.by_command: Dict[str, List[float]] = {}
+        # driver.get() на справжні сторінки (без about:blank / data:)
+        self.page_loads = 0
+        self.page_load_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, command: str, seconds: float, params: Optional[dict] = None):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            entry = self.by_command.setdefault(command, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            if command == "get" and params and not str(params.get("url", "")).startswith(
+                ("about:", "data:")
+            ):
+                self.page_loads += 1
+                self.page_load_seconds += seconds
+
+    def snapshot(self) -> Tuple[int, float]:
+        return self.count, self.seconds
+
+
+# драйвер -> CommandStats
+_stats = weakref.WeakKeyDictionary()
+
+
+def instrument_driver(driver) -> CommandStats:
+    """
+    Обгортає command_executor.execute драйвера: кожна WebDriver-команда
+    потрапляє в CommandStats. Повторний виклик повертає ту саму статистику.
+    """
+    stats = _stats.get(driver)
+    if stats is not None:
+        return stats
+
+    stats = CommandStats()
+    executor = driver.command_executor
+    original_execute = executor.execute
+
+    def execute(command, params):
+        started = time.perf_counter()
+        try:
+            return original_execute(command, params)
+        finally:
+            stats.record(command, time.perf_counter() - started, params)
+
+    executor.execute = execute
+    _stats[driver] = stats
+    return stats
+
+
+def command_stats(driver) -> Optional[CommandStats]:
+    if driver is None:
+        return None
+    return _stats.get(driver)
+
+
+def attach_stats(driver) -> CommandStats:
+    """
+    CommandStats для драйвера без command_executor (напр. HttpDriver):
+    драйвер сам викликає record() для кожного запиту.
+    """
+    stats = _stats.get(driver)
+    if stats is None:
+        stats = _stats[driver] = CommandStats()
+    return stats
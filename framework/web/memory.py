@@ -0,0 +1,169 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    # є в requirements.txt; без нього читаємо /proc (лише Linux)
+    import psutil
+except ImportError:
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _proc_children(pid: int) -> Optional[List[int]]:
+    """Діти процесу з /proc/<pid>/task/*/children; None — файлу немає (старе ядро)."""
+    children: List[int] = []
+    try:
+        tasks = list(Path(f"/proc/{pid}/task").iterdir())
+    except OSError:
+        return []
+    for task in tasks:
+        try:
+            children.extend(int(c) for c in (task / "children").read_text().split())
+        except FileNotFoundError:
+            return None
+        except OSError:
+            continue
+    return children
+
+
+def _proc_parents() -> Dict[int, List[int]]:
+    # запасний шлях: повне сканування /proc/*/stat
+    tree: Dict[int, List[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # comm у дужках може містити пробіли — ppid іде одразу після ")"
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        tree.setdefault(ppid, []).append(int(entry.name))
+    return tree
+
+
+def _proc_rss(pid: int) -> int:
+    try:
+        resident = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident * _PAGE_SIZE
+
+
+def _proc_tree(pid: int) -> Iterable[int]:
+    parents: Optional[Dict[int, List[int]]] = None
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        yield current
+        children = _proc_children(current)
+        if children is None:
+            if parents is None:
+                parents = _proc_parents()
+            children = parents.get(current, [])
+        stack.extend(children)
+
+
+def rss_available() -> bool:
+    """Чи можна на цій машині виміряти RSS процесу (psutil або /proc)."""
+    return psutil is not None or Path("/proc").is_dir()
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Сумарний RSS процесу і всіх його нащадків у байтах; None — не виміряти."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    if not rss_available():
+        return None
+    return sum(_proc_rss(p) for p in _proc_tree(pid)) or None
+
+
+def driver_rss(driver) -> Optional[int]:
+    """
+    RSS браузера драйвера: chromedriver/geckodriver разом з браузером
+    і його процесами рендерингу. None — драйвер без локального процесу.
+    """
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    pid = getattr(process, "pid", None)
+    if pid is None:
+        return None
+    return process_tree_rss(pid)
+
+
+class MemoryStats:
+    """Пам'ять браузерів за прогін: виміри RSS наприкінці сценаріїв і перезапуски."""
+
+    def __init__(self, max_rss_mb: Optional[int] = None):
+        self.max_rss_mb = max_rss_mb
+        self.samples = 0
+        self.total_bytes = 0
+        self.peak_bytes = 0
+        # сесії, перезапущені через перевищення max_rss_mb
+        self.recycled = 0
+        # вкладки, які сценарії відкрили і не закрили
+        self.leaked_tabs = 0
+        # виміри, що не вдалися (немає psutil і /proc, віддалений драйвер)
+        self.unmeasured = 0
+        self._lock = threading.Lock()
+
+    def over_limit(self, driver) -> bool:
+        """Вимірює RSS драйвера; True — перевищено max_rss_mb, час перезапустити браузер."""
+        rss = driver_rss(driver)
+        if rss is None:
+            with self._lock:
+                self.unmeasured += 1
+            return False
+        with self._lock:
+            self.samples += 1
+            self.total_bytes += rss
+            self.peak_bytes = max(self.peak_bytes, rss)
+            if self.max_rss_mb and rss > self.max_rss_mb * 1024 * 1024:
+                self.recycled += 1
+                return True
+        return False
+
+    def add_leaked_tabs(self, count: int):
+        with self._lock:
+            self.leaked_tabs += count
+
+    def as_dict(self) -> Dict[str, object]:
+        mb = 1024 * 1024
+        return {
+            "max_rss_mb": self.max_rss_mb,
+            "samples": self.samples,
+            "avg_rss_mb": round(self.total_bytes / self.samples / mb, 1) if self.samples else None,
+            "peak_rss_mb": round(self.peak_bytes / mb, 1) if self.samples else None,
+            "recycled": self.recycled,
+            "leaked_tabs": self.leaked_tabs,
+            "unmeasured": self.unmeasured,
+        }
+
+    def report(self) -> str:
+        data = self.as_dict()
+        if not data["samples"]:
+            memory = "not measured"
+            if self.max_rss_mb and self.unmeasured:
+                memory += ", RSS limit was not enforced"
+        else:
+            memory = "avg {} MB, peak {} MB at scenario end".format(
+                data["avg_rss_mb"], data["peak_rss_mb"]
+            )
+        limit = f"{self.recycled} recycled over {self.max_rss_mb} MB" if self.max_rss_mb else "no RSS limit"
+        return "Browser memory: {}; {}; {} leaked tab(s) closed".format(
+            memory, limit, self.leaked_tabs
+        )
@@ -0,0 +1,225 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from framework.web.waits import _ensure_script_timeout, _supports_js
+
+# Navigation Timing + Resource Timing поточної сторінки одним викликом.
+# Ресурси агрегуються в браузері: назад приходять суми і кілька найбільших,
+# а не сотні записів. Якщо load ще не настав (eager-профіль), скрипт чекає
+# до waitMs, далі повертає те, що є (load = null).
+_METRICS_ASYNC_JS = """
+var waitMs = arguments[0], done = arguments[arguments.length - 1];
+var started = Date.now();
+
+function collect() {
+    var nav = performance.getEntriesByType("navigation")[0];
+    if (!nav) { return null; }
+    var resources = performance.getEntriesByType("resource");
+    var bytes = nav.transferSize || 0, byType = {}, sized = [];
+    for (var i = 0; i < resources.length; i++) {
+        var r = resources[i], size = r.transferSize || 0;
+        bytes += size;
+        var t = byType[r.initiatorType] || (byType[r.initiatorType] = {count: 0, bytes: 0});
+        t.count += 1;
+        t.bytes += size;
+        sized.push({url: r.name, bytes: size});
+    }
+    sized.sort(function (a, b) { return b.bytes - a.bytes; });
+    return {
+        url: nav.name,
+        load: nav.loadEventEnd > 0 ? nav.duration : null,
+        dcl: nav.domContentLoadedEventEnd > 0 ? nav.domContentLoadedEventEnd : null,
+        ttfb: nav.responseStart,
+        document_bytes: nav.transferSize || 0,
+        transfer_bytes: bytes,
+        resource_count: resources.length,
+        by_type: byType,
+        largest: sized.slice(0, 5)
+    };
+}
+
+(function poll() {
+    var metrics = collect();
+    if ((metrics && metrics.load !== null) || Date.now() - started >= waitMs) {
+        done(metrics);
+        return;
+    }
+    setTimeout(poll, 50);
+})();
+"""
+
+# скільки прогонів тримати в page_metrics.json
+MAX_RUNS = 100
+
+
+@dataclass
+class PageMetrics:
+    """Метрики одного завантаження сторінки (мілісекунди, байти)."""
+    url: str
+    # None — load ще не настав (eager-профіль без очікування)
+    load_ms: Optional[float]
+    dom_content_loaded_ms: Optional[float]
+    ttfb_ms: float
+    document_bytes: int
+    # документ + усі ресурси; крос-доменні ресурси без Timing-Allow-Origin
+    # і ресурси з кешу браузер рахує як 0
+    transfer_bytes: int
+    resource_count: int
+    by_type: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    largest: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def capture_page_metrics(driver, wait: float = 0) -> Optional[PageMetrics]:
+    """
+    Метрики поточного документа. wait — скільки секунд чекати на подію load.
+    None — драйвер без JS (HttpDriver) або сторінка без navigation entry.
+    """
+    if not _supports_js(driver):
+        return None
+    if wait > 0:
+        _ensure_script_timeout(driver, wait)
+    raw = driver.execute_async_script(_METRICS_ASYNC_JS, int(wait * 1000))
+    if not raw:
+        return None
+    return PageMetrics(
+        url=raw["url"],
+        load_ms=raw["load"],
+        dom_content_loaded_ms=raw["dcl"],
+        ttfb_ms=raw["ttfb"],
+        document_bytes=int(raw["document_bytes"]),
+        transfer_bytes=int(raw["transfer_bytes"]),
+        resource_count=int(raw["resource_count"]),
+        by_type=raw["by_type"] or {},
+        largest=raw["largest"] or [],
+    )
+
+
+def _page_key(url: str) -> str:
+    # query і fragment не розбивають сторінку на окремі ряди
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+
+class _PageSeries:
+    __slots__ = ("samples", "load_ms", "transfer_bytes", "resources")
+
+    def __init__(self):
+        self.samples = 0
+        self.load_ms: List[float] = []
+        self.transfer_bytes: List[int] = []
+        self.resources = 0
+
+
+class PageMetricsLog:
+    """
+    Метрики сторінок за прогін, згруповані за URL (потокобезпечно: воркери
+    пишуть одночасно). write() дописує прогін у часовий ряд page_metrics.json.
+    """
+
+    def __init__(self):
+        self._pages: Dict[str, _PageSeries] = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics: PageMetrics):
+        with self._lock:
+            series = self._pages.setdefault(_page_key(metrics.url), _PageSeries())
+            series.samples += 1
+            if metrics.load_ms is not None:
+                series.load_ms.append(metrics.load_ms)
+            series.transfer_bytes.append(metrics.transfer_bytes)
+            series.resources += metrics.resource_count
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    @property
+    def samples(self) -> int:
+        with self._lock:
+            return sum(series.samples for series in self._pages.values())
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            pages = dict(self._pages)
+        return {url: _summarize(series) for url, series in sorted(pages.items())}
+
+    def report(self) -> str:
+        pages = self.summary()
+        samples = sum(page["samples"] for page in pages.values())
+        lines = [f"Page metrics: {samples} loads of {len(pages)} page(s)"]
+        for url, page in pages.items():
+            load = page["load_ms"]
+            timing = (
+                f"load avg {load['avg']:.0f} ms, p95 {load['p95']:.0f} ms"
+                if load else "load event not reached"
+            )
+            kilobytes = page["transfer_bytes"]["avg"] / 1024
+            lines.append(f"  {url}: {timing}, {kilobytes:.1f} KB transferred")
+        return "\n".join(lines)
+
+    def write(self, path: Path, **meta):
+        """Додає прогін у кінець ряду; найстаріші прогони понад MAX_RUNS відкидаються."""
+        path = Path(path)
+        runs: List[Dict[str, Any]] = []
+        try:
+            runs = json.loads(path.read_text(encoding="utf-8")).get("runs", [])
+        except (OSError, ValueError, AttributeError):
+            pass
+        run = {"generated_at": datetime.now(timezone.utc).isoformat()}
+        run.update(meta)
+        run["pages"] = self.summary()
+        runs = (runs + [run])[-MAX_RUNS:]
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"runs": runs}, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _summarize(series: _PageSeries) -> Dict[str, Any]:
+    load = None
+    if series.load_ms:
+        load = {
+            "avg": round(sum(series.load_ms) / len(series.load_ms), 1),
+            "p95": round(_percentile(series.load_ms, 0.95), 1),
+            "max": round(max(series.load_ms), 1),
+        }
+    return {
+        "samples": series.samples,
+        "load_ms": load,
+        "transfer_bytes": {
+            "avg": round(sum(series.transfer_bytes) / len(series.transfer_bytes)),
+            "max": max(series.transfer_bytes),
+        },
+        "resources_avg": round(series.resources / series.samples, 1),
+    }
+
+
+# спільний для процесу: BasePage.open пише сюди, раннер зберігає в reports/
+page_metrics_log = PageMetricsLog()
+
+
+def record_page_metrics(driver) -> Optional[PageMetrics]:
+    """Знімає метрики щойно відкритої сторінки; збій зняття не валить крок."""
+    if not _supports_js(driver):
+        return None
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+        metrics = capture_page_metrics(driver)
+    except WebDriverException:
+        return None
+    if metrics is not None:
+        page_metrics_log.record(metrics)
+    return metrics
@@ -0,0 +1,265 @@
+"""
+Запис і відтворення HTTP-відповідей сайту для офлайн-прогонів.
+
+Браузер ходить не на https://kwiga.com, а на локальний сервер за адресою
+http://kwiga.com.localhost:<port> (*.localhost браузери резолвлять у 127.0.0.1).
+Сервер відновлює справжній хост з заголовка Host і:
+- record: бере відповідь з живого сайту, зберігає на диск і віддає браузеру;
+- replay: віддає збережену відповідь, у мережу не ходить взагалі.
+Абсолютні посилання на записувані хости в HTML/CSS/JS та заголовку Location
+переписуються на локальні адреси.
+"""
+import hashlib
+import http.client
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+# хости (та їх піддомени), які записуються і переписуються
+DEFAULT_HOSTS = ("kwiga.com",)
+
+# заголовки, які не зберігаємо і не передаємо браузеру
+_DROP_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "content-security-policy",
+    "content-security-policy-report-only",
+    "keep-alive",
+    "strict-transport-security",
+    "transfer-encoding",
+    "alt-svc",
+}
+
+_TEXT_TYPES = ("text/", "javascript", "json", "xml", "svg")
+
+
+class SnapshotServer:
+    def __init__(
+        self,
+        directory: Path,
+        mode: str = "replay",
+        hosts: Sequence[str] = DEFAULT_HOSTS,
+        port: int = 0,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unsupported snapshot mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.hosts = tuple(hosts)
+        self.requested_port = port
+        self.port: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        # https://kwiga.com, //unlock.kwiga.com, https:\/\/kwiga.com (JSON/JS)
+        self._host_re = re.compile(
+            r"(https?:)?(//|\\/\\/)((?:[a-z0-9-]+\.)*(?:{}))(?![a-z0-9-]|\.[a-z])".format(
+                "|".join(re.escape(h) for h in self.hosts)
+            ),
+            re.IGNORECASE,
+        )
+        self._local_re = re.compile(r"http://([a-z0-9.-]+)\.localhost:\d+", re.IGNORECASE)
+
+    # --------------------
+    # Життєвий цикл
+    # --------------------
+
+    def start(self) -> "SnapshotServer":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot = self
+
+        class Handler(_SnapshotHandler):
+            server_snapshot = snapshot
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.requested_port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever, name="kwiga-snapshot", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def report(self) -> str:
+        return "Snapshot {} ({}): {} served from disk, {} recorded, {} missing".format(
+            self.mode, self.directory, self.hits, self.recorded, self.misses
+        )
+
+    # --------------------
+    # Переписування адрес
+    # --------------------
+
+    def is_snapshot_host(self, host: str) -> bool:
+        host = host.lower()
+        return any(host == h or host.endswith("." + h) for h in self.hosts)
+
+    def local_host(self, host: str) -> str:
+        return f"{host}.localhost:{self.port}"
+
+    def rewrite_url(self, url: str) -> str:
+        """https://kwiga.com/ua -> http://kwiga.com.localhost:<port>/ua"""
+        parts = urlsplit(url)
+        if not parts.hostname or not self.is_snapshot_host(parts.hostname):
+            return url
+        return urlunsplit(
+            ("http", self.local_host(parts.hostname), parts.path, parts.query, parts.fragment)
+        )
+
+    def upstream_url(self, url: str) -> str:
+        """Зворотне перетворення (для Referer / Origin у запитах до сайту)."""
+        return self._local_re.sub(lambda m: f"https://{m.group(1)}", url)
+
+    def rewrite_body(self, body: bytes, content_type: str) -> bytes:
+        if not any(t in content_type for t in _TEXT_TYPES):
+            return body
+        text = body.decode("utf-8", errors="surrogateescape")
+        text = self._host_re.sub(
+            lambda m: "{}{}{}".format(
+                "http:" if m.group(1) else "", m.group(2), self.local_host(m.group(3))
+            ),
+            text,
+        )
+        return text.encode("utf-8", errors="surrogateescape")
+
+    # --------------------
+    # Сховище
+    # --------------------
+
+    def _entry_path(self, method: str, host: str, target: str, body: bytes) -> Path:
+        digest = hashlib.sha1(
+            b"\0".join([method.encode(), target.encode(), body])
+        ).hexdigest()
+        return self.directory / host / digest
+
+    def load(self, method, host, target, body) -> Optional[Tuple[int, List[List[str]], bytes]]:
+        path = self._entry_path(method, host, target, body)
+        try:
+            meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+            data = path.with_suffix(".body").read_bytes()
+        except FileNotFoundError:
+            return None
+        return meta["status"], meta["headers"], data
+
+    def save(self, method, host, target, body, status, headers, data):
+        path = self._entry_path(method, host, target, body)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.with_suffix(".body").write_bytes(data)
+        path.with_suffix(".json").write_text(
+            json.dumps(
+                {"url": f"https://{host}{target}", "method": method,
+                 "status": status, "headers": headers},
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+    def fetch_upstream(self, method, host, target, headers, body):
+        """Запит до справжнього сайту без слідування редіректам."""
+        conn = http.client.HTTPSConnection(host, timeout=30)
+        try:
+            upstream_headers = {}
+            for name, value in headers:
+                lower = name.lower()
+                if lower in ("host", "accept-encoding", "connection", "keep-alive"):
+                    continue
+                if lower in ("referer", "origin"):
+                    value = self.upstream_url(value)
+                upstream_headers[name] = value
+            upstream_headers["Host"] = host
+            # без стиснення: тіло потрібно переписувати
+            upstream_headers["Accept-Encoding"] = "identity"
+            conn.request(method, target, body=body or None, headers=upstream_headers)
+            response = conn.getresponse()
+            data = response.read()
+            kept = [
+                [name, value] for name, value in response.getheaders()
+                if name.lower() not in _DROP_HEADERS
+            ]
+            return response.status, kept, data
+        finally:
+            conn.close()
+
+
+class _SnapshotHandler(BaseHTTPRequestHandler):
+    server_snapshot: SnapshotServer
+    protocol_version = "HTTP/1.1"
+    # заголовки і тіло йдуть окремими write — без TCP_NODELAY keep-alive
+    # клієнт чекає ~40 мс (delayed ACK) на кожну відповідь
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        snapshot = self.server_snapshot
+        host = self.headers.get("Host", "").split(":")[0]
+        if host.endswith(".localhost"):
+            host = host[: -len(".localhost")]
+        if not snapshot.is_snapshot_host(host):
+            self.send_error(404, f"Host is not part of the snapshot: {host}")
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        entry = snapshot.load(self.command, host, self.path, body)
+        if entry is not None:
+            with snapshot._lock:
+                snapshot.hits += 1
+        elif snapshot.mode == "record":
+            try:
+                entry = snapshot.fetch_upstream(
+                    self.command, host, self.path, self.headers.items(), body
+                )
+            except Exception as e:
+                self.send_error(502, f"Upstream error: {e}")
+                return
+            snapshot.save(self.command, host, self.path, body, *entry)
+            with snapshot._lock:
+                snapshot.recorded += 1
+        else:
+            with snapshot._lock:
+                snapshot.misses += 1
+            self.send_error(404, f"Not in snapshot: {self.command} https://{host}{self.path}")
+            return
+
+        status, headers, data = entry
+        content_type = ""
+        for name, value in headers:
+            if name.lower() == "content-type":
+                content_type = value.lower()
+        data = snapshot.rewrite_body(data, content_type)
+
+        self.send_response(status)
+        for name, value in headers:
+            lower = name.lower()
+            if lower == "location":
+                value = snapshot.rewrite_url(value)
+            elif lower == "set-cookie":
+                # Domain=kwiga.com не підходить для kwiga.com.localhost
+                value = re.sub(r";\s*domain=[^;]*", "", value, flags=re.IGNORECASE)
+                # сервер віддає http, тож Secure-cookie браузер не збереже; а
+                # SameSite=None без Secure браузер відкидає — прибираємо обидва
+                value = re.sub(r";\s*secure(?=\s*(;|$))", "", value, flags=re.IGNORECASE)
+                value = re.sub(r";\s*samesite\s*=\s*none(?=\s*(;|$))", "", value, flags=re.IGNORECASE)
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_HEAD = _handle
@@ -1,10 +1,219 @@
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import time
+import weakref
+from typing import List, Optional
+
+# selenium (навіть selenium.common) імпортуємо в момент використання:
+# --dry-run і HTTP-прогони обходяться без нього
 
 def wait_visible(driver, locator, timeout=10):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     by, value = locator
     return WebDriverWait(driver, timeout).until(EC.visibility_of_element_located((by, value)))
 
 def wait_all(driver, locator, timeout=10):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     by, value = locator
     return WebDriverWait(driver, timeout).until(EC.visibility_of_all_elements_located((by, value)))
+
+def wait_new_window(driver, known, timeout=10) -> Optional[str]:
+    """
+    Чекає, поки з'явиться вкладка, якої немає в known (клік з target=_blank
+    відкриває її асинхронно). Повертає її дескриптор або None по таймауту.
+    """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    def new_handles(d):
+        return [h for h in d.window_handles if h not in known]
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(new_handles)[-1]
+    except TimeoutException:
+        return None
+
+
+# --------------------
+# Пошук тексту всередині браузера
+# --------------------
+# Замість передачі всього page_source по WebDriver-протоколу шукаємо текст
+# у самій сторінці і повертаємо лише короткий фрагмент навколо збігу.
+# Спершу шукаємо в textContent, потім в outerHTML — так само, як раніше
+# працювала перевірка `snippet in page_source` (текст в атрибутах теж рахується).
+
+_FIND_TEXT_JS = """
+function kwigaFindText(needle, radius) {
+    var root = document.documentElement;
+    if (!root) { return null; }
+    var hay = root.textContent || "";
+    var i = hay.indexOf(needle);
+    if (i < 0) {
+        hay = root.outerHTML;
+        i = hay.indexOf(needle);
+    }
+    if (i < 0) { return null; }
+    var start = Math.max(0, i - radius);
+    return hay.slice(start, i + needle.length + radius).replace(/\\s+/g, " ");
+}
+"""
+
+_FIND_TEXT_SYNC_JS = _FIND_TEXT_JS + """
+return kwigaFindText(arguments[0], arguments[1]);
+"""
+
+# Чекає на текст через MutationObserver: перевірка запускається лише після
+# змін DOM (не частіше ніж раз на 50 мс), результат повертається по таймауту.
+_WAIT_TEXT_ASYNC_JS = _FIND_TEXT_JS + """
+var needle = arguments[0], radius = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var found = kwigaFindText(needle, radius);
+if (found !== null) { done(found); return; }
+
+var finished = false, pending = false, observer, timer;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(result);
+}
+observer = new MutationObserver(function () {
+    if (pending) { return; }
+    pending = true;
+    setTimeout(function () {
+        pending = false;
+        var result = kwigaFindText(needle, radius);
+        if (result !== null) { finish(result); }
+    }, 50);
+});
+observer.observe(document, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(function () { finish(kwigaFindText(needle, radius)); }, timeoutMs);
+"""
+
+# драйвер -> виставлений script timeout (секунди), щоб не слати команду щоразу
+_script_timeouts = weakref.WeakKeyDictionary()
+
+
+def _ensure_script_timeout(driver, timeout: float):
+    needed = max(30, int(timeout) + 5)
+    if _script_timeouts.get(driver, 0) < needed:
+        driver.set_script_timeout(needed)
+        _script_timeouts[driver] = needed
+
+
+def _supports_js(driver) -> bool:
+    # HttpDriver (http_backend) не виконує JS — шукає в завантаженому HTML
+    return getattr(driver, "supports_js", True)
+
+
+def find_text(driver, text: str, context: int = 40) -> Optional[str]:
+    """Одна перевірка: фрагмент сторінки навколо text або None."""
+    if not _supports_js(driver):
+        return driver.find_text(text, context)
+    return driver.execute_script(_FIND_TEXT_SYNC_JS, text, context)
+
+
+def wait_for_text(
+    driver, text: str, timeout: float = 10, context: int = 40, observe: bool = True
+) -> Optional[str]:
+    """
+    Чекає, поки text з'явиться на сторінці. Повертає фрагмент навколо збігу
+    або None після timeout. observe=False — звичайний поллінг find_text.
+    """
+    if not _supports_js(driver):
+        # статична сторінка не зміниться — чекати нема на що
+        return driver.find_text(text, context)
+
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    deadline = time.monotonic() + timeout
+
+    if observe:
+        _ensure_script_timeout(driver, timeout)
+        while True:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            try:
+                return driver.execute_async_script(
+                    _WAIT_TEXT_ASYNC_JS, text, context, max(remaining_ms, 0)
+                )
+            except TimeoutException:
+                return None
+            except WebDriverException:
+                # сторінка перезавантажилась під час очікування — пробуємо знову
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.1)
+
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda d: find_text(d, text, context)
+        )
+    except TimeoutException:
+        return None
+
+
+# Пакетна перевірка кількох умов однією командою: чекаємо (через
+# MutationObserver), поки виконаються всі текстові умови з wait=true,
+# і повертаємо результат кожної умови окремо.
+_CHECK_PAGE_ASYNC_JS = _FIND_TEXT_JS + """
+var checks = arguments[0], radius = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+
+function evaluate() {
+    return checks.map(function (check) {
+        if (check.kind === "url") {
+            var href = window.location.href;
+            return {ok: href.indexOf(check.value) >= 0, detail: href};
+        }
+        var found = kwigaFindText(check.value, radius);
+        return {ok: found !== null, detail: found};
+    });
+}
+function settled(results) {
+    for (var i = 0; i < checks.length; i++) {
+        if (checks[i].wait && !results[i].ok) { return false; }
+    }
+    return true;
+}
+
+var results = evaluate();
+if (settled(results)) { done(results); return; }
+
+var finished = false, pending = false, observer, timer;
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(evaluate());
+}
+observer = new MutationObserver(function () {
+    if (pending) { return; }
+    pending = true;
+    setTimeout(function () {
+        pending = false;
+        if (settled(evaluate())) { finish(); }
+    }, 50);
+});
+observer.observe(document, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(finish, timeoutMs);
+"""
+
+
+def check_page(driver, checks: List[dict], timeout: float = 10, context: int = 40) -> List[dict]:
+    """
+    Перевіряє кілька умов за один виклик до браузера.
+    checks: [{"kind": "text" | "url", "value": str, "wait": bool}, ...]
+    Повертає [{"ok": bool, "detail": фрагмент тексту / поточний URL}, ...].
+    """
+    if not _supports_js(driver):
+        return driver.check_page(checks, context)
+    _ensure_script_timeout(driver, timeout)
+    return driver.execute_async_script(
+        _CHECK_PAGE_ASYNC_JS, checks, context, int(timeout * 1000)
+    )